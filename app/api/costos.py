@@ -0,0 +1,51 @@
+"""
+Agregados compartidos por los routers de ganancias y finanzas:
+costos operativos y totales de la tabla ganancias.
+"""
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.database import get_table
+
+# costos_operativos casi no cambia: solo se reescribe en cada rebuild,
+# que invalida la cache via clear_all()
+_cache = TTLCache(ttl=30, maxsize=1)
+
+
+def costos_mensuales(db: Session) -> float:
+    """Total mensual de costos operativos activos (cacheado)."""
+    total = _cache.get("mensual")
+    if total is not None:
+        return total
+
+    ct = get_table("costos_operativos")
+    if ct is None:
+        return 0.0
+    total = float(
+        db.execute(
+            select(func.coalesce(func.sum(ct.c.monto), 0)).where(ct.c.activo == 1)
+        ).scalar()
+    )
+    _cache.set("mensual", total)
+    return total
+
+
+def totales_ganancias(db: Session, gt, *condiciones) -> tuple[int, float, float, float, float]:
+    """
+    Retorna (dias, total_bruta, total_simple, max_bruta, min_bruta) en una
+    sola pasada SQL sobre ganancias (ganancia_neta en DB es la simple).
+    """
+    dias, total_bruta, total_simple, max_bruta, min_bruta = db.execute(
+        select(
+            func.count(),
+            func.coalesce(func.sum(gt.c.ganancia_bruta), 0),
+            func.coalesce(func.sum(gt.c.ganancia_neta), 0),
+            func.coalesce(func.max(gt.c.ganancia_bruta), 0),
+            func.coalesce(func.min(gt.c.ganancia_bruta), 0),
+        )
+        .select_from(gt)
+        .where(*condiciones)
+    ).one()
+    return dias, float(total_bruta), float(total_simple), float(max_bruta), float(min_bruta)
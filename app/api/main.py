@@ -5,7 +5,7 @@ Aplicacion FastAPI con lifespan.
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from loguru import logger
 
 from app.api.routers import consultas, finanzas, ganancias, productos, sistema, ventas
@@ -25,13 +25,14 @@ app = FastAPI(
     description="API REST para consultar la base de datos Manoli",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 
 @app.exception_handler(RuntimeError)
 async def runtime_error_handler(request: Request, exc: RuntimeError):
     """Captura errores cuando la DB no esta lista."""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=503,
         content={"error": str(exc), "mensaje": "Base de datos no disponible. Esperando primer sync desde Gmail."},
     )
@@ -0,0 +1,64 @@
+"""
+Helpers para serializar resultados de SQLAlchemy en las respuestas.
+"""
+
+from collections.abc import Callable, Iterator
+
+import orjson
+from fastapi.responses import StreamingResponse
+from sqlalchemy.engine import Result
+
+from app.core.database import get_session
+
+# Filas por particion al hacer streaming: acota la memoria residente
+_STREAM_PARTITION = 500
+
+
+def rows_as_dicts(result: Result) -> list[dict]:
+    """
+    Convierte un Result en lista de dicts.
+    Resuelve los nombres de columna una sola vez en vez de pasar por
+    Row._mapping en cada fila (~2x mas rapido en listados grandes).
+    """
+    keys = list(result.keys())
+    return [dict(zip(keys, row)) for row in result]
+
+
+def stream_rows(
+    head: dict,
+    stmt,
+    transform: Callable[[dict], dict] | None = None,
+    key: str = "data",
+) -> StreamingResponse:
+    """
+    Responde {**head, key: [filas...]} en streaming.
+    Las filas se leen con yield_per y se serializan por particion, asi la
+    memoria queda acotada a una particion y el cliente recibe los primeros
+    bytes antes de que termine la consulta.
+    Usa su propia session: la de get_db se cierra al terminar el endpoint.
+    """
+
+    def generate() -> Iterator[bytes]:
+        session = get_session()
+        try:
+            result = session.execute(stmt, execution_options={"yield_per": _STREAM_PARTITION})
+            # quoted_name es subclase de str y orjson solo acepta str puro como clave
+            keys = [str(k) for k in result.keys()]
+
+            prefix = orjson.dumps(head)[:-1]
+            yield prefix + (b"," if head else b"") + orjson.dumps(key) + b":["
+
+            first = True
+            for partition in result.partitions():
+                rows = (dict(zip(keys, row)) for row in partition)
+                if transform is not None:
+                    rows = map(transform, rows)
+                chunk = b",".join(orjson.dumps(r) for r in rows)
+                yield chunk if first else b"," + chunk
+                first = False
+
+            yield b"]}"
+        finally:
+            session.close()
+
+    return StreamingResponse(generate(), media_type="application/json")
@@ -3,26 +3,17 @@ Router de finanzas: /api/finanzas/
 """
 
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy import func
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
+from app.api.costos import costos_mensuales, totales_ganancias
 from app.api.dependencies import get_db
+from app.api.responses import rows_as_dicts
 from app.core.database import get_table
 
 router = APIRouter()
 
 
-def _costos_mensuales(db: Session) -> tuple[float, list[dict]]:
-    """Retorna (total_mensual, lista_costos)."""
-    ct = get_table("costos_operativos")
-    if ct is None:
-        return 0.0, []
-    rows = db.execute(ct.select().where(ct.c.activo == 1)).fetchall()
-    datos = [dict(r._mapping) for r in rows]
-    total = sum(float(d.get("monto", 0) or 0) for d in datos)
-    return total, datos
-
-
 @router.get("/costos")
 def costos_operativos(
     solo_activos: bool = Query(True),
@@ -37,8 +28,7 @@ def costos_operativos(
     if solo_activos:
         q = q.where(t.c.activo == 1)
 
-    rows = db.execute(q).fetchall()
-    datos = [dict(r._mapping) for r in rows]
+    datos = rows_as_dicts(db.execute(q))
     total = sum(float(d.get("monto", 0) or 0) for d in datos)
 
     return {
@@ -63,10 +53,10 @@ def impuestos(
     if solo_activos:
         q = q.where(t.c.activo == 1)
 
-    rows = db.execute(q).fetchall()
+    datos = rows_as_dicts(db.execute(q))
     return {
-        "data": [dict(r._mapping) for r in rows],
-        "count": len(rows),
+        "data": datos,
+        "count": len(datos),
     }
 
 
@@ -81,20 +71,15 @@ def balance(
     if gt is None:
         return {"error": "Tabla ganancias no disponible"}
 
-    gq = gt.select()
+    condiciones = []
     if desde:
-        gq = gq.where(gt.c.fecha >= desde)
+        condiciones.append(gt.c.fecha >= desde)
     if hasta:
-        gq = gq.where(gt.c.fecha <= hasta)
-
-    g_rows = db.execute(gq).fetchall()
-    g_datos = [dict(r._mapping) for r in g_rows]
-    dias = len(g_datos)
+        condiciones.append(gt.c.fecha <= hasta)
 
-    total_bruta = sum(float(d.get("ganancia_bruta", 0) or 0) for d in g_datos)
-    total_simple = sum(float(d.get("ganancia_neta", 0) or 0) for d in g_datos)
+    dias, total_bruta, total_simple, _, _ = totales_ganancias(db, gt, *condiciones)
 
-    costos_mes, _ = _costos_mensuales(db)
+    costos_mes = costos_mensuales(db)
     costo_diario = costos_mes / 30
     total_costos_periodo = costo_diario * dias
     total_neta = total_simple - total_costos_periodo
@@ -121,10 +106,10 @@ def cierre_caja(
     if t is None:
         return {"error": "Tabla no disponible"}
 
-    rows = db.execute(t.select().order_by(t.c.fecha.desc()).limit(limit)).fetchall()
+    datos = rows_as_dicts(db.execute(t.select().order_by(t.c.fecha.desc()).limit(limit)))
     return {
-        "data": [dict(r._mapping) for r in rows],
-        "count": len(rows),
+        "data": datos,
+        "count": len(datos),
     }
 
 
@@ -134,15 +119,10 @@ def resumen_financiero(db: Session = Depends(get_db)):
     result = {}
 
     gt = get_table("ganancias")
-    if gt:
-        g_rows = db.execute(gt.select()).fetchall()
-        g_datos = [dict(r._mapping) for r in g_rows]
-        dias = len(g_datos)
-
-        total_bruta = sum(float(d.get("ganancia_bruta", 0) or 0) for d in g_datos)
-        total_simple = sum(float(d.get("ganancia_neta", 0) or 0) for d in g_datos)
+    if gt is not None:
+        dias, total_bruta, total_simple, _, _ = totales_ganancias(db, gt)
 
-        costos_mes, _ = _costos_mensuales(db)
+        costos_mes = costos_mensuales(db)
         costo_diario = costos_mes / 30
         total_neta = total_simple - (costo_diario * dias)
 
@@ -153,12 +133,16 @@ def resumen_financiero(db: Session = Depends(get_db)):
         result["costos_mensuales"] = round(costos_mes, 2)
         result["costo_diario"] = round(costo_diario, 2)
 
-    vt = get_table("ventas_registro")
-    if vt:
-        result["total_ventas"] = db.execute(vt.select().with_only_columns(func.count())).scalar()
-
-    pt = get_table("productos")
-    if pt:
-        result["total_productos"] = db.execute(pt.select().with_only_columns(func.count())).scalar()
+    # Ambos COUNT en un solo round-trip: SELECT (SELECT COUNT(*) ...), (SELECT COUNT(*) ...)
+    conteos = {
+        clave: select(func.count()).select_from(t).scalar_subquery().label(clave)
+        for clave, t in (
+            ("total_ventas", get_table("ventas_registro")),
+            ("total_productos", get_table("productos")),
+        )
+        if t is not None
+    }
+    if conteos:
+        result.update(db.execute(select(*conteos.values())).one()._asdict())
 
     return result
@@ -10,10 +10,12 @@ Tipos de ganancia:
 from datetime import date
 
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy import func
+from sqlalchemy import func, lambda_stmt, select
 from sqlalchemy.orm import Session
 
+from app.api.costos import costos_mensuales, totales_ganancias
 from app.api.dependencies import get_db
+from app.api.responses import rows_as_dicts, stream_rows
 from app.core.database import get_table
 
 router = APIRouter()
@@ -28,22 +30,19 @@ def _ganancia_table():
 
 def _costos_diarios(db: Session) -> float:
     """Calcula costos operativos diarios: suma de costos mensuales activos / 30."""
-    ct = get_table("costos_operativos")
-    if ct is None:
-        return 0.0
-    rows = db.execute(ct.select().where(ct.c.activo == 1)).fetchall()
-    total_mensual = sum(float(dict(r._mapping).get("monto", 0) or 0) for r in rows)
-    return total_mensual / 30
+    return costos_mensuales(db) / 30
 
 
 def _enriquecer(dato: dict, costo_diario: float) -> dict:
-    """Agrega ganancia_simple y ganancia_neta calculada a un registro."""
-    bruta = float(dato.get("ganancia_bruta", 0) or 0)
-    simple = float(dato.get("ganancia_neta", 0) or 0)  # en DB es bruta - stock
-    neta = simple - costo_diario
+    """
+    Agrega ganancia_simple y ganancia_neta calculada a un registro (in-place).
+    Las columnas REAL ya llegan como float (sin float()); se redondean a 2
+    decimales para no exponer artefactos como 123.45000000000002.
+    """
+    simple = dato.get("ganancia_neta") or 0.0  # en DB es bruta - stock
+    dato["ganancia_bruta"] = round(dato.get("ganancia_bruta") or 0.0, 2)
     dato["ganancia_simple"] = round(simple, 2)
-    dato["ganancia_neta"] = round(neta, 2)
-    dato["ganancia_bruta"] = round(bruta, 2)
+    dato["ganancia_neta"] = round(simple - costo_diario, 2)
     return dato
 
 
@@ -57,11 +56,12 @@ def listar_ganancias(
     t = _ganancia_table()
     costo_d = _costos_diarios(db)
 
-    rows = db.execute(t.select().order_by(t.c.fecha.desc()).limit(limit).offset(offset)).fetchall()
-    total = db.execute(t.select().with_only_columns(func.count())).scalar()
+    stmt = lambda_stmt(lambda: select(t).order_by(t.c.fecha.desc()).limit(limit).offset(offset))
+    datos = rows_as_dicts(db.execute(stmt))
+    total = db.execute(select(func.count()).select_from(t)).scalar()
 
     return {
-        "data": [_enriquecer(dict(r._mapping), costo_d) for r in rows],
+        "data": [_enriquecer(d, costo_d) for d in datos],
         "costos_diarios": round(costo_d, 2),
         "total": total,
         "limit": limit,
@@ -78,7 +78,7 @@ def ganancias_hoy(db: Session = Depends(get_db)):
 
     row = db.execute(t.select().where(t.c.fecha == hoy)).fetchone()
     if row:
-        return {"data": _enriquecer(dict(row._mapping), costo_d), "fecha": hoy, "costos_diarios": round(costo_d, 2)}
+        return {"data": _enriquecer(row._asdict(), costo_d), "fecha": hoy, "costos_diarios": round(costo_d, 2)}
     return {"data": None, "fecha": hoy, "mensaje": "Sin datos para hoy"}
 
 
@@ -86,45 +86,51 @@ def ganancias_hoy(db: Session = Depends(get_db)):
 def resumen_ganancias(
     desde: str = Query(None, description="Fecha inicio YYYY-MM-DD"),
     hasta: str = Query(None, description="Fecha fin YYYY-MM-DD"),
+    include_rows: bool = Query(False, description="Incluir el detalle por dia"),
     db: Session = Depends(get_db),
 ):
     """Resumen de ganancias con totales y promedios."""
     t = _ganancia_table()
     costo_d = _costos_diarios(db)
 
-    q = t.select()
+    condiciones = []
     if desde:
-        q = q.where(t.c.fecha >= desde)
+        condiciones.append(t.c.fecha >= desde)
     if hasta:
-        q = q.where(t.c.fecha <= hasta)
+        condiciones.append(t.c.fecha <= hasta)
 
-    rows = db.execute(q.order_by(t.c.fecha.desc())).fetchall()
+    n, total_bruta, total_simple, max_bruta, min_bruta = totales_ganancias(db, t, *condiciones)
 
-    if not rows:
+    if not n:
         return {"data": [], "resumen": None}
 
-    datos = [_enriquecer(dict(r._mapping), costo_d) for r in rows]
-    brutas = [d["ganancia_bruta"] for d in datos]
-    simples = [d["ganancia_simple"] for d in datos]
-    netas = [d["ganancia_neta"] for d in datos]
-    n = len(datos)
+    total_neta = total_simple - costo_d * n
 
-    return {
-        "data": datos,
+    respuesta = {
         "costos_diarios": round(costo_d, 2),
         "resumen": {
             "dias": n,
-            "total_bruta": round(sum(brutas), 2),
-            "total_simple": round(sum(simples), 2),
-            "total_neta": round(sum(netas), 2),
-            "promedio_bruta": round(sum(brutas) / n, 2),
-            "promedio_simple": round(sum(simples) / n, 2),
-            "promedio_neta": round(sum(netas) / n, 2),
-            "max_bruta": round(max(brutas), 2),
-            "min_bruta": round(min(brutas), 2),
+            "total_bruta": round(total_bruta, 2),
+            "total_simple": round(total_simple, 2),
+            "total_neta": round(total_neta, 2),
+            "promedio_bruta": round(total_bruta / n, 2),
+            "promedio_simple": round(total_simple / n, 2),
+            "promedio_neta": round(total_neta / n, 2),
+            "max_bruta": round(max_bruta, 2),
+            "min_bruta": round(min_bruta, 2),
         },
     }
 
+    if not include_rows:
+        return {"data": [], **respuesta}
+
+    # El detalle puede abarcar anos de datos: se envia en streaming
+    return stream_rows(
+        respuesta,
+        t.select().where(*condiciones).order_by(t.c.fecha.desc()),
+        transform=lambda d: _enriquecer(d, costo_d),
+    )
+
 
 @router.get("/mes")
 def ganancias_mes(
@@ -145,22 +151,23 @@ def ganancias_mes(
         hasta = f"{anio:04d}-{mes + 1:02d}-01"
 
     t = _ganancia_table()
-    rows = db.execute(
-        t.select().where(t.c.fecha >= desde, t.c.fecha < hasta).order_by(t.c.fecha.desc())
-    ).fetchall()
+    condiciones = (t.c.fecha >= desde, t.c.fecha < hasta)
 
-    datos = [_enriquecer(dict(r._mapping), costo_d) for r in rows]
-    brutas = [d["ganancia_bruta"] for d in datos]
-    simples = [d["ganancia_simple"] for d in datos]
-    netas = [d["ganancia_neta"] for d in datos]
+    filas = rows_as_dicts(db.execute(t.select().where(*condiciones).order_by(t.c.fecha.desc())))
+    # Las filas del mes ya estan en memoria: los totales salen de ellas, sin otro
+    # scan. Se suman antes de _enriquecer, con los valores sin redondear
+    n = len(filas)
+    total_bruta = sum(d.get("ganancia_bruta") or 0.0 for d in filas)
+    total_simple = sum(d.get("ganancia_neta") or 0.0 for d in filas)
+    datos = [_enriquecer(d, costo_d) for d in filas]
 
     return {
         "mes": mes,
         "anio": anio,
         "data": datos,
         "costos_diarios": round(costo_d, 2),
-        "total_bruta": round(sum(brutas), 2),
-        "total_simple": round(sum(simples), 2),
-        "total_neta": round(sum(netas), 2),
-        "dias_con_datos": len(datos),
+        "total_bruta": round(total_bruta, 2),
+        "total_simple": round(total_simple, 2),
+        "total_neta": round(total_simple - costo_d * n, 2),
+        "dias_con_datos": n,
     }
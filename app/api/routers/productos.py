@@ -3,10 +3,11 @@ Router de productos: /api/productos/
 """
 
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy import func, or_
+from sqlalchemy import case, func, lambda_stmt, or_, select
 from sqlalchemy.orm import Session
 
 from app.api.dependencies import get_db
+from app.api.responses import rows_as_dicts
 from app.core.database import get_table
 
 router = APIRouter()
@@ -36,22 +37,38 @@ def buscar_productos(
 ):
     """Buscar productos con filtros."""
     t = _productos_table()
-    query = t.select()
 
+    patron = f"%{q}%"
+    condiciones = []
     if q:
-        query = query.where(t.c.nombre.like(f"%{q}%"))
+        condiciones.append(t.c.nombre.like(patron))
     if categoria_id:
-        query = query.where(t.c.categoria_id == categoria_id)
+        condiciones.append(t.c.categoria_id == categoria_id)
 
-    total = db.execute(
-        t.select().with_only_columns(func.count()).where(
-            t.c.nombre.like(f"%{q}%") if q else True
-        )
-    ).scalar()
+    # El total sale de una window function sobre el mismo filtro: un solo scan.
+    # lambda_stmt cachea la construccion; los filtros y limit/offset van como binds.
+    stmt = lambda_stmt(lambda: select(t, func.count().over().label("_total")))
+    if q:
+        stmt += lambda s: s.where(t.c.nombre.like(patron))
+    if categoria_id:
+        stmt += lambda s: s.where(t.c.categoria_id == categoria_id)
+    stmt += lambda s: s.order_by(t.c.nombre).limit(limit).offset(offset)
+
+    result = db.execute(stmt)
+    # La ultima columna es _total: zip la descarta al armar cada dict
+    keys = list(result.keys())[:-1]
+    rows = result.fetchall()
+
+    if rows:
+        total = rows[0]._total
+    elif offset:
+        # Pagina fuera de rango: la window function no devuelve filas
+        total = db.execute(select(func.count()).select_from(t).where(*condiciones)).scalar()
+    else:
+        total = 0
 
-    rows = db.execute(query.order_by(t.c.nombre).limit(limit).offset(offset)).fetchall()
     return {
-        "data": [dict(r._mapping) for r in rows],
+        "data": [dict(zip(keys, r)) for r in rows],
         "total": total,
         "limit": limit,
         "offset": offset,
@@ -62,30 +79,33 @@ def buscar_productos(
 def info_producto(producto_id: int, db: Session = Depends(get_db)):
     """Informacion detallada de un producto."""
     t = _productos_table()
-    row = db.execute(t.select().where(t.c.id == producto_id)).fetchone()
-    if not row:
-        return {"error": "Producto no encontrado", "producto_id": producto_id}
-
-    producto = dict(row._mapping)
-
-    # Contar stock disponible
     st = _stock_table()
-    stock_total = db.execute(
-        st.select().with_only_columns(func.count()).where(
-            st.c.producto_id == producto_id
-        )
-    ).scalar()
-    stock_disponible = db.execute(
-        st.select().with_only_columns(func.count()).where(
-            st.c.producto_id == producto_id,
-            st.c.estado == "disponible",
+
+    # Conteos de stock en un solo agregado condicional, unido al producto
+    stock = (
+        select(
+            st.c.producto_id,
+            func.count().label("stock_total"),
+            func.sum(case((st.c.estado == "disponible", 1), else_=0)).label("stock_disponible"),
         )
-    ).scalar()
+        .where(st.c.producto_id == producto_id)
+        .group_by(st.c.producto_id)
+        .subquery()
+    )
 
-    producto["stock_total"] = stock_total
-    producto["stock_disponible"] = stock_disponible
+    row = db.execute(
+        select(
+            t,
+            func.coalesce(stock.c.stock_total, 0).label("stock_total"),
+            func.coalesce(stock.c.stock_disponible, 0).label("stock_disponible"),
+        )
+        .select_from(t.outerjoin(stock, stock.c.producto_id == t.c.id))
+        .where(t.c.id == producto_id)
+    ).fetchone()
+    if not row:
+        return {"error": "Producto no encontrado", "producto_id": producto_id}
 
-    return {"data": producto}
+    return {"data": row._asdict()}
 
 
 @router.get("/bajo-stock")
@@ -129,9 +149,9 @@ def bajo_stock(
         .order_by(func.coalesce(stock_count.c.stock_disponible, 0))
     )
 
-    rows = db.execute(q).fetchall()
+    datos = rows_as_dicts(db.execute(q))
     return {
         "umbral": umbral,
-        "data": [dict(r._mapping) for r in rows],
-        "count": len(rows),
+        "data": datos,
+        "count": len(datos),
     }
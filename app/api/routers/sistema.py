@@ -4,7 +4,8 @@ Router de sistema: /api/sistema/
 
 from datetime import datetime
 
-from fastapi import APIRouter, Depends
+import orjson
+from fastapi import APIRouter, Depends, Response
 from sqlalchemy import func, text
 from sqlalchemy.orm import Session
 
@@ -16,28 +17,61 @@ router = APIRouter()
 
 _start_time = datetime.now()
 
+# settings solo cambia al reiniciar: la parte fija de /health y todo /info
+# se serializan una vez al importar el modulo
+_HEALTH_HEAD = orjson.dumps({"status": "ok", "database": str(settings.db_path)})[:-1]
+_INFO_BODY = orjson.dumps({
+    "nombre": "Manoli Database API",
+    "version": "1.0.0",
+    "database_path": str(settings.db_path),
+    "json_path": str(settings.json_file_path),
+    "api_port": settings.api_port,
+    "sql_max_rows": settings.sql_max_rows,
+    "inicio": _start_time.isoformat(),
+})
+
 
 @router.get("/health")
 def health():
     """Estado del sistema."""
-    return {
-        "status": "ok",
-        "uptime_seconds": (datetime.now() - _start_time).total_seconds(),
-        "database": str(settings.db_path),
-        "tablas_disponibles": len(get_table_names()),
-    }
+    # Solo uptime y cantidad de tablas (cambia con cada rebuild) son dinamicos
+    uptime = (datetime.now() - _start_time).total_seconds()
+    tablas = len(get_table_names())
+    body = _HEALTH_HEAD + b',"uptime_seconds":%r,"tablas_disponibles":%d}' % (uptime, tablas)
+    return Response(content=body, media_type="application/json")
+
+
+def _conteos(db: Session, names: list[str]) -> dict[str, int]:
+    """Cuenta registros de todas las tablas en un solo statement UNION ALL."""
+    if not names:
+        return {}
+    partes = []
+    params = {}
+    for i, name in enumerate(names):
+        ident = name.replace("`", "``")
+        partes.append(f"SELECT :n{i} AS nombre, COUNT(*) AS registros FROM `{ident}`")
+        params[f"n{i}"] = name
+    rows = db.execute(text(" UNION ALL ".join(partes)), params).fetchall()
+    return {nombre: registros for nombre, registros in rows}
 
 
 @router.get("/tablas")
 def listar_tablas(db: Session = Depends(get_db)):
     """Lista todas las tablas con conteo de registros."""
-    tablas = []
-    for name in get_table_names():
-        try:
-            count = db.execute(text(f'SELECT COUNT(*) FROM `{name}`')).scalar()
-            tablas.append({"nombre": name, "registros": count})
-        except Exception:
-            tablas.append({"nombre": name, "registros": -1})
+    # Solo nombres reflejados por automap: no se interpola input del usuario
+    names = get_table_names()
+    try:
+        conteos = _conteos(db, names)
+    except Exception:
+        # Alguna tabla no se pudo contar: fallback tabla por tabla
+        conteos = {}
+        for name in names:
+            try:
+                conteos[name] = db.execute(text(f'SELECT COUNT(*) FROM `{name}`')).scalar()
+            except Exception:
+                conteos[name] = -1
+
+    tablas = [{"nombre": name, "registros": conteos.get(name, -1)} for name in names]
 
     return {
         "tablas": tablas,
@@ -48,12 +82,4 @@ def listar_tablas(db: Session = Depends(get_db)):
 @router.get("/info")
 def info_sistema():
     """Informacion general del sistema."""
-    return {
-        "nombre": "Manoli Database API",
-        "version": "1.0.0",
-        "database_path": str(settings.db_path),
-        "json_path": str(settings.json_file_path),
-        "api_port": settings.api_port,
-        "sql_max_rows": settings.sql_max_rows,
-        "inicio": _start_time.isoformat(),
-    }
+    return Response(content=_INFO_BODY, media_type="application/json")
@@ -2,13 +2,14 @@
 Router de ventas: /api/ventas/
 """
 
-from datetime import date
+from datetime import date, timedelta
 
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy import func
+from sqlalchemy import func, lambda_stmt, select
 from sqlalchemy.orm import Session
 
 from app.api.dependencies import get_db
+from app.api.responses import rows_as_dicts, stream_rows
 from app.core.database import get_table
 
 router = APIRouter()
@@ -35,6 +36,31 @@ def _productos_table():
     return t
 
 
+def _rango_dia(dia: date) -> tuple[str, str]:
+    """Rango semiabierto [dia, dia + 1) para filtrar fecha con el indice."""
+    return dia.isoformat(), (dia + timedelta(days=1)).isoformat()
+
+
+def _rango_mes(mes: int, anio: int) -> tuple[str, str]:
+    """Rango semiabierto [primer dia del mes, primer dia del mes siguiente)."""
+    desde = f"{anio:04d}-{mes:02d}-01"
+    if mes == 12:
+        hasta = f"{anio + 1:04d}-01-01"
+    else:
+        hasta = f"{anio:04d}-{mes + 1:02d}-01"
+    return desde, hasta
+
+
+def _totales(db: Session, t, *condiciones) -> tuple[int, float]:
+    """Retorna (cantidad, total_monto) agregados en SQL."""
+    cantidad, total_monto = db.execute(
+        select(func.count(), func.coalesce(func.sum(t.c.total), 0))
+        .select_from(t)
+        .where(*condiciones)
+    ).one()
+    return cantidad, float(total_monto)
+
+
 @router.get("/")
 def listar_ventas(
     limit: int = Query(50, ge=1, le=500),
@@ -44,13 +70,18 @@ def listar_ventas(
 ):
     """Lista ventas con paginacion."""
     t = _ventas_table()
-    q = t.select()
+    # lambda_stmt cachea la construccion del statement; limit/offset/estado van como binds
+    stmt = lambda_stmt(lambda: select(t))
+    condiciones = []
     if estado:
-        q = q.where(t.c.estado == estado)
-    rows = db.execute(q.order_by(t.c.fecha.desc()).limit(limit).offset(offset)).fetchall()
-    total = db.execute(t.select().with_only_columns(func.count())).scalar()
+        stmt += lambda s: s.where(t.c.estado == estado)
+        condiciones.append(t.c.estado == estado)
+    stmt += lambda s: s.order_by(t.c.fecha.desc()).limit(limit).offset(offset)
+
+    datos = rows_as_dicts(db.execute(stmt))
+    total = db.execute(select(func.count()).select_from(t).where(*condiciones)).scalar()
     return {
-        "data": [dict(r._mapping) for r in rows],
+        "data": datos,
         "total": total,
         "limit": limit,
         "offset": offset,
@@ -61,13 +92,14 @@ def listar_ventas(
 def ventas_hoy(db: Session = Depends(get_db)):
     """Ventas del dia actual."""
     t = _ventas_table()
-    hoy = date.today().isoformat()
-    rows = db.execute(t.select().where(t.c.fecha.like(f"{hoy}%"))).fetchall()
-    datos = [dict(r._mapping) for r in rows]
-    total_monto = sum(float(d.get("total", 0) or 0) for d in datos)
+    desde, hasta = _rango_dia(date.today())
+    condiciones = (t.c.fecha >= desde, t.c.fecha < hasta)
+
+    cantidad, total_monto = _totales(db, t, *condiciones)
+    datos = rows_as_dicts(db.execute(t.select().where(*condiciones)))
     return {
-        "fecha": hoy,
-        "cantidad": len(datos),
+        "fecha": desde,
+        "cantidad": cantidad,
         "total_monto": round(total_monto, 2),
         "data": datos,
     }
@@ -75,29 +107,36 @@ def ventas_hoy(db: Session = Depends(get_db)):
 
 @router.get("/resumen/diario")
 def resumen_diario(
-    fecha: str = Query(None, description="Fecha YYYY-MM-DD (default: hoy)"),
+    fecha: str = Query(None, description="Fecha YYYY-MM-DD o mes YYYY-MM (default: hoy)"),
     db: Session = Depends(get_db),
 ):
-    """Resumen de ventas de un dia especifico."""
+    """Resumen de ventas de un dia especifico (o de un mes con YYYY-MM)."""
     t = _ventas_table()
-    fecha = fecha or date.today().isoformat()
-
-    rows = db.execute(t.select().where(t.c.fecha.like(f"{fecha}%"))).fetchall()
-    datos = [dict(r._mapping) for r in rows]
-
-    total_monto = sum(float(d.get("total", 0) or 0) for d in datos)
-
-    # Desglose por metodo de pago
-    metodos = {}
-    for d in datos:
-        metodo = d.get("metodo_pago", "desconocido") or "desconocido"
-        metodos[metodo] = metodos.get(metodo, 0) + float(d.get("total", 0) or 0)
+    try:
+        if fecha and len(fecha) == 7:
+            # Prefijo YYYY-MM, como aceptaba el LIKE original: todo el mes
+            inicio = date.fromisoformat(f"{fecha}-01")
+            desde, hasta = _rango_mes(inicio.month, inicio.year)
+        else:
+            dia = date.fromisoformat(fecha) if fecha else date.today()
+            fecha = dia.isoformat()
+            desde, hasta = _rango_dia(dia)
+    except ValueError:
+        return {"error": "Fecha invalida, usar YYYY-MM-DD o YYYY-MM", "fecha": fecha}
+
+    # Desglose por metodo de pago agregado en SQL; los totales salen de los grupos
+    metodo = func.coalesce(func.nullif(t.c.metodo_pago, ""), "desconocido").label("metodo")
+    grupos = db.execute(
+        select(metodo, func.count(), func.coalesce(func.sum(t.c.total), 0))
+        .where(t.c.fecha >= desde, t.c.fecha < hasta)
+        .group_by(metodo)
+    ).fetchall()
 
     return {
         "fecha": fecha,
-        "cantidad_ventas": len(datos),
-        "total_monto": round(total_monto, 2),
-        "por_metodo_pago": {k: round(v, 2) for k, v in metodos.items()},
+        "cantidad_ventas": sum(cantidad for _, cantidad, _ in grupos),
+        "total_monto": round(sum(float(monto) for _, _, monto in grupos), 2),
+        "por_metodo_pago": {nombre: round(float(monto), 2) for nombre, _, monto in grupos},
     }
 
 
@@ -110,25 +149,29 @@ def top_productos(
     vd = _detalle_table()
     p = _productos_table()
 
-    # Join ventas_detalle con productos
-    q = (
-        vd.join(p, vd.c.producto_id == p.c.id)
-        .select()
-        .with_only_columns(
-            p.c.id,
-            p.c.nombre,
+    # Agregar ventas_detalle primero y joinear productos solo para los top `limit`.
+    # El semi-join descarta detalles de productos inexistentes, igual que el JOIN.
+    agg = (
+        select(
+            vd.c.producto_id,
             func.sum(vd.c.cantidad).label("total_vendido"),
             func.sum(vd.c.subtotal).label("total_ingresos"),
-            func.count(vd.c.id).label("num_ventas"),
+            func.count().label("num_ventas"),
         )
-        .group_by(p.c.id, p.c.nombre)
+        .where(vd.c.producto_id.in_(select(p.c.id)))
+        .group_by(vd.c.producto_id)
         .order_by(func.sum(vd.c.cantidad).desc())
         .limit(limit)
+        .cte("agg")
+    )
+    q = (
+        select(p.c.id, p.c.nombre, agg.c.total_vendido, agg.c.total_ingresos, agg.c.num_ventas)
+        .select_from(agg.join(p, p.c.id == agg.c.producto_id))
+        .order_by(agg.c.total_vendido.desc())
     )
 
-    rows = db.execute(q).fetchall()
     return {
-        "data": [dict(r._mapping) for r in rows],
+        "data": rows_as_dicts(db.execute(q)),
         "limit": limit,
     }
 
@@ -145,16 +188,18 @@ def ventas_mes(
     anio = anio or hoy.year
 
     t = _ventas_table()
-    prefijo = f"{anio:04d}-{mes:02d}"
-    rows = db.execute(t.select().where(t.c.fecha.like(f"{prefijo}%")).order_by(t.c.fecha.desc())).fetchall()
-
-    datos = [dict(r._mapping) for r in rows]
-    total_monto = sum(float(d.get("total", 0) or 0) for d in datos)
-
-    return {
-        "mes": mes,
-        "anio": anio,
-        "cantidad_ventas": len(datos),
-        "total_monto": round(total_monto, 2),
-        "data": datos,
-    }
+    desde, hasta = _rango_mes(mes, anio)
+    condiciones = (t.c.fecha >= desde, t.c.fecha < hasta)
+
+    cantidad, total_monto = _totales(db, t, *condiciones)
+
+    # Un mes de ventas puede ser grande: las filas se envian en streaming
+    return stream_rows(
+        {
+            "mes": mes,
+            "anio": anio,
+            "cantidad_ventas": cantidad,
+            "total_monto": round(total_monto, 2),
+        },
+        t.select().where(*condiciones).order_by(t.c.fecha.desc()),
+    )
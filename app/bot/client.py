@@ -2,6 +2,7 @@
 ManoliBot: Discord bot que consume la API REST.
 """
 
+import aiohttp
 import discord
 from discord.ext import commands
 from loguru import logger
@@ -20,9 +21,17 @@ class ManoliBot(commands.Bot):
             help_command=commands.DefaultHelpCommand(no_category="Otros"),
         )
         self.api_base = settings.api_base_url
+        # Cliente HTTP compartido por todos los cogs: reutiliza conexiones keep-alive
+        # (no usar self.http, es el HTTPClient interno de discord.py)
+        self.api: aiohttp.ClientSession | None = None
 
     async def setup_hook(self):
-        """Carga los cogs al iniciar."""
+        """Crea la sesion HTTP de la API y carga los cogs al iniciar."""
+        self.api = aiohttp.ClientSession(
+            base_url=self.api_base,
+            connector=aiohttp.TCPConnector(limit=50, keepalive_timeout=60),
+            timeout=aiohttp.ClientTimeout(total=15),
+        )
         cog_modules = [
             "app.bot.cogs.ganancias",
             "app.bot.cogs.ventas",
@@ -37,6 +46,11 @@ class ManoliBot(commands.Bot):
             except Exception as e:
                 logger.error("Error cargando cog {}: {}", module, e)
 
+    async def close(self):
+        if self.api is not None:
+            await self.api.close()
+        await super().close()
+
     async def on_ready(self):
         logger.info("Bot conectado como: {} (ID: {})", self.user.name, self.user.id)
         await self.change_presence(
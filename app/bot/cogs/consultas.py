@@ -2,91 +2,97 @@
 Cog de consultas: !sql, !tablas, !estado
 """
 
-import httpx
+import aiohttp
+import orjson
 from discord.ext import commands
 
-from app.bot.formatters import embed_error, embed_info, embed_ok, table_to_text
+from app.bot.formatters import embed_error, embed_fields, embed_ok, from_template, info_template, table_to_text
 from app.config import settings
 
 p = settings.discord_prefix
 
+_HEALTH_TIMEOUT = aiohttp.ClientTimeout(total=10)
+
+
+# Embeds estaticos: se construyen una vez al importar el cog
+_SIN_RESULTADOS = info_template("SQL", "Sin resultados")
+_SIN_TABLAS = info_template("Tablas", "No hay tablas disponibles")
+
+# Ayuda de !comandos: el prefijo es fijo, los campos se arman una vez al importar
+_COMANDOS_DESCRIPCION = "**Tipos de ganancia:** Bruta (total ventas) | Simple (bruta - stock) | Neta (simple - costos diarios)"
+_COMANDOS_CAMPOS = [
+    (
+        "Ganancias (bruta/simple/neta)",
+        (
+            f"`{p}ganancia hoy` - Ganancia del dia\n"
+            f"`{p}ganancia mes [mes] [anio]` - Ganancia del mes\n"
+            f"`{p}ganancia rango <desde> [hasta]` - Rango de fechas\n"
+            f"`{p}ganancia promedio` - Promedio general\n"
+            f"`{p}ganancia full` - Hoy, mes y promedio juntos"
+        ),
+        False,
+    ),
+    (
+        "Ventas",
+        (
+            f"`{p}ventas hoy` - Ventas del dia\n"
+            f"`{p}ventas dia <fecha>` - Ventas de un dia\n"
+            f"`{p}ventas mes [mes] [anio]` - Ventas del mes\n"
+            f"`{p}ventas top [cantidad]` - Top productos vendidos"
+        ),
+        False,
+    ),
+    (
+        "Productos",
+        (
+            f"`{p}producto buscar <nombre>` - Buscar producto\n"
+            f"`{p}producto info <id>` - Info detallada\n"
+            f"`{p}producto stock [umbral]` - Bajo stock"
+        ),
+        False,
+    ),
+    (
+        "Finanzas",
+        (
+            f"`{p}finanzas costos` - Costos operativos\n"
+            f"`{p}finanzas impuestos` - Impuestos\n"
+            f"`{p}finanzas balance [desde] [hasta]` - Balance\n"
+            f"`{p}finanzas resumen` - Resumen general\n"
+            f"`{p}finanzas caja` - Cierres de caja\n"
+            f"`{p}finanzas dashboard` - Resumen, caja y costos juntos"
+        ),
+        False,
+    ),
+    (
+        "Sistema y SQL",
+        (
+            f"`{p}sql <SELECT ...>` - SQL generico\n"
+            f"`{p}tablas` - Lista tablas de la DB\n"
+            f"`{p}estado` - Estado del sistema\n"
+            f"`{p}comandos` - Esta lista"
+        ),
+        False,
+    ),
+]
+
 
 class ConsultasCog(commands.Cog, name="Consultas"):
     """Comandos de consulta SQL generica y sistema."""
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.api_base = bot.api_base
 
     @commands.command(name="comandos")
     async def comandos(self, ctx: commands.Context):
         """Muestra todos los comandos disponibles."""
-        em = embed_ok("Comandos de Manoli Bot")
-        em.description = "**Tipos de ganancia:** Bruta (total ventas) | Simple (bruta - stock) | Neta (simple - costos diarios)"
-
-        em.add_field(
-            name="Ganancias (bruta/simple/neta)",
-            value=(
-                f"`{p}ganancia hoy` - Ganancia del dia\n"
-                f"`{p}ganancia mes [mes] [anio]` - Ganancia del mes\n"
-                f"`{p}ganancia rango <desde> [hasta]` - Rango de fechas\n"
-                f"`{p}ganancia promedio` - Promedio general"
-            ),
-            inline=False,
-        )
-        em.add_field(
-            name="Ventas",
-            value=(
-                f"`{p}ventas hoy` - Ventas del dia\n"
-                f"`{p}ventas dia <fecha>` - Ventas de un dia\n"
-                f"`{p}ventas mes [mes] [anio]` - Ventas del mes\n"
-                f"`{p}ventas top [cantidad]` - Top productos vendidos"
-            ),
-            inline=False,
-        )
-        em.add_field(
-            name="Productos",
-            value=(
-                f"`{p}producto buscar <nombre>` - Buscar producto\n"
-                f"`{p}producto info <id>` - Info detallada\n"
-                f"`{p}producto stock [umbral]` - Bajo stock"
-            ),
-            inline=False,
-        )
-        em.add_field(
-            name="Finanzas",
-            value=(
-                f"`{p}finanzas costos` - Costos operativos\n"
-                f"`{p}finanzas impuestos` - Impuestos\n"
-                f"`{p}finanzas balance [desde] [hasta]` - Balance\n"
-                f"`{p}finanzas resumen` - Resumen general\n"
-                f"`{p}finanzas caja` - Cierres de caja"
-            ),
-            inline=False,
-        )
-        em.add_field(
-            name="Sistema y SQL",
-            value=(
-                f"`{p}sql <SELECT ...>` - SQL generico\n"
-                f"`{p}tablas` - Lista tablas de la DB\n"
-                f"`{p}estado` - Estado del sistema\n"
-                f"`{p}comandos` - Esta lista"
-            ),
-            inline=False,
-        )
-
+        em = embed_fields("Comandos de Manoli Bot", _COMANDOS_CAMPOS, description=_COMANDOS_DESCRIPCION)
         await ctx.send(embed=em)
 
     @commands.command(name="sql")
     async def sql_query(self, ctx: commands.Context, *, query: str):
         """Ejecuta SQL generico (solo SELECT). Uso: !sql SELECT * FROM productos LIMIT 5"""
-        async with httpx.AsyncClient() as client:
-            r = await client.post(
-                f"{self.api_base}/api/sql/query",
-                json={"query": query},
-                timeout=15,
-            )
-            data = r.json()
+        async with self.bot.api.post("/api/sql/query", json={"query": query}) as r:
+            data = orjson.loads(await r.read())
 
         if "error" in data:
             await ctx.send(embed=embed_error(data["error"]))
@@ -97,7 +103,7 @@ class ConsultasCog(commands.Cog, name="Consultas"):
         count = data.get("count", 0)
 
         if not rows:
-            await ctx.send(embed=embed_info("SQL", "Sin resultados"))
+            await ctx.send(embed=from_template(_SIN_RESULTADOS))
             return
 
         table_text = table_to_text(columns, rows)
@@ -108,13 +114,12 @@ class ConsultasCog(commands.Cog, name="Consultas"):
     @commands.command(name="tablas")
     async def listar_tablas(self, ctx: commands.Context):
         """Lista todas las tablas de la base de datos."""
-        async with httpx.AsyncClient() as client:
-            r = await client.get(f"{self.api_base}/api/sistema/tablas", timeout=15)
-            data = r.json()
+        async with self.bot.api.get("/api/sistema/tablas") as r:
+            data = orjson.loads(await r.read())
 
         tablas = data.get("tablas", [])
         if not tablas:
-            await ctx.send(embed=embed_info("Tablas", "No hay tablas disponibles"))
+            await ctx.send(embed=from_template(_SIN_TABLAS))
             return
 
         em = embed_ok(f"Tablas ({data.get('total', len(tablas))})")
@@ -130,19 +135,21 @@ class ConsultasCog(commands.Cog, name="Consultas"):
     @commands.command(name="estado")
     async def estado(self, ctx: commands.Context):
         """Estado del sistema (health check)."""
-        async with httpx.AsyncClient() as client:
-            r = await client.get(f"{self.api_base}/api/sistema/health", timeout=10)
-            data = r.json()
-
-        em = embed_ok("Estado del Sistema")
-        em.add_field(name="Status", value=data.get("status", "?"), inline=True)
+        async with self.bot.api.get("/api/sistema/health", timeout=_HEALTH_TIMEOUT) as r:
+            data = orjson.loads(await r.read())
 
         uptime = data.get("uptime_seconds", 0)
         hours = int(uptime // 3600)
         minutes = int((uptime % 3600) // 60)
-        em.add_field(name="Uptime", value=f"{hours}h {minutes}m", inline=True)
 
-        em.add_field(name="Tablas", value=str(data.get("tablas_disponibles", 0)), inline=True)
+        em = embed_fields(
+            "Estado del Sistema",
+            [
+                ("Status", data.get("status", "?")),
+                ("Uptime", f"{hours}h {minutes}m"),
+                ("Tablas", str(data.get("tablas_disponibles", 0))),
+            ],
+        )
         await ctx.send(embed=em)
 
 
@@ -1,28 +1,38 @@
 """
-Cog de finanzas: !finanzas costos|impuestos|balance|resumen|caja
+Cog de finanzas: !finanzas costos|impuestos|balance|resumen|caja|dashboard
 """
 
-import httpx
+import asyncio
+
 from discord.ext import commands
 
-from app.bot.formatters import embed_info, embed_ok, format_money
+from app.bot.formatters import embed_fields, embed_info, embed_ok, format_money, from_template, info_template
+from app.bot.httpcache import BaseAPIClientCog
+
+
+# Embeds estaticos: se construyen una vez al importar el cog
+_SIN_CIERRES = info_template("Cierre de Caja", "Sin registros")
 
 
-class FinanzasCog(commands.Cog, name="Finanzas"):
+def _detalle_cierre(c: dict) -> str:
+    """Total/efectivo/transferencia de un cierre de caja, una linea cada uno."""
+    return (
+        f"Total: {format_money(c.get('monto_total'))}\n"
+        f"Efectivo: {format_money(c.get('monto_efectivo'))}\n"
+        f"Transferencia: {format_money(c.get('monto_transferencia'))}"
+    )
+
+
+class FinanzasCog(BaseAPIClientCog, name="Finanzas"):
     """Comandos para consultas financieras."""
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.base = f"{bot.api_base}/api/finanzas"
-
-    async def _get(self, path: str, params: dict = None) -> dict:
-        async with httpx.AsyncClient() as client:
-            r = await client.get(f"{self.base}{path}", params=params, timeout=15)
-            return r.json()
+        self.base = "/api/finanzas"
 
     @commands.group(name="finanzas", invoke_without_command=True)
     async def finanzas(self, ctx: commands.Context):
-        """Consultas financieras. Subcomandos: costos, impuestos, balance, resumen, caja"""
+        """Consultas financieras. Subcomandos: costos, impuestos, balance, resumen, caja, dashboard"""
         await ctx.send_help(ctx.command)
 
     @finanzas.command(name="costos")
@@ -34,13 +44,11 @@ class FinanzasCog(commands.Cog, name="Finanzas"):
         em = embed_ok(f"Costos Operativos ({data.get('count', 0)})")
 
         if items:
-            lines = []
-            for c in items:
-                nombre = c.get("nombre", "?")
-                monto = format_money(c.get("monto"))
-                recurrente = "Recurrente" if c.get("recurrente") else "Unico"
-                lines.append(f"**{nombre}** | {monto} | {recurrente}")
-            em.description = "\n".join(lines)
+            em.description = "\n".join(
+                f"**{c.get('nombre', '?')}** | {format_money(c.get('monto'))} | "
+                f"{'Recurrente' if c.get('recurrente') else 'Unico'}"
+                for c in items
+            )
             em.add_field(name="Total Mensual", value=format_money(data.get("total_mensual")), inline=True)
             em.add_field(name="Costo Diario (/30)", value=format_money(data.get("costo_diario")), inline=True)
         else:
@@ -89,13 +97,17 @@ class FinanzasCog(commands.Cog, name="Finanzas"):
         if periodo.get("desde") or periodo.get("hasta"):
             titulo += f" ({periodo.get('desde', '?')} a {periodo.get('hasta', '?')})"
 
-        em = embed_ok(titulo)
-        em.add_field(name="Bruta", value=format_money(data.get("ganancia_bruta")), inline=True)
-        em.add_field(name="Simple", value=format_money(data.get("ganancia_simple")), inline=True)
-        em.add_field(name="Neta", value=format_money(data.get("ganancia_neta")), inline=True)
-        em.add_field(name="Costos Mensuales", value=format_money(data.get("costos_mensuales")), inline=True)
-        em.add_field(name="Costo Diario", value=format_money(data.get("costo_diario")), inline=True)
-        em.add_field(name="Dias", value=str(data.get("dias_con_datos", 0)), inline=True)
+        em = embed_fields(
+            titulo,
+            [
+                ("Bruta", format_money(data.get("ganancia_bruta"))),
+                ("Simple", format_money(data.get("ganancia_simple"))),
+                ("Neta", format_money(data.get("ganancia_neta"))),
+                ("Costos Mensuales", format_money(data.get("costos_mensuales"))),
+                ("Costo Diario", format_money(data.get("costo_diario"))),
+                ("Dias", str(data.get("dias_con_datos", 0))),
+            ],
+        )
         await ctx.send(embed=em)
 
     @finanzas.command(name="resumen")
@@ -103,15 +115,19 @@ class FinanzasCog(commands.Cog, name="Finanzas"):
         """Resumen financiero general."""
         data = await self._get("/resumen")
 
-        em = embed_ok("Resumen Financiero General")
-        em.add_field(name="Bruta Total", value=format_money(data.get("total_bruta")), inline=True)
-        em.add_field(name="Simple Total", value=format_money(data.get("total_simple")), inline=True)
-        em.add_field(name="Neta Total", value=format_money(data.get("total_neta")), inline=True)
-        em.add_field(name="Dias Registrados", value=str(data.get("dias_registrados", 0)), inline=True)
-        em.add_field(name="Total Ventas", value=str(data.get("total_ventas", 0)), inline=True)
-        em.add_field(name="Total Productos", value=str(data.get("total_productos", 0)), inline=True)
-        em.add_field(name="Costos Mensuales", value=format_money(data.get("costos_mensuales")), inline=True)
-        em.add_field(name="Costo Diario", value=format_money(data.get("costo_diario")), inline=True)
+        em = embed_fields(
+            "Resumen Financiero General",
+            [
+                ("Bruta Total", format_money(data.get("total_bruta"))),
+                ("Simple Total", format_money(data.get("total_simple"))),
+                ("Neta Total", format_money(data.get("total_neta"))),
+                ("Dias Registrados", str(data.get("dias_registrados", 0))),
+                ("Total Ventas", str(data.get("total_ventas", 0))),
+                ("Total Productos", str(data.get("total_productos", 0))),
+                ("Costos Mensuales", format_money(data.get("costos_mensuales"))),
+                ("Costo Diario", format_money(data.get("costo_diario"))),
+            ],
+        )
         await ctx.send(embed=em)
 
     @finanzas.command(name="caja")
@@ -121,21 +137,39 @@ class FinanzasCog(commands.Cog, name="Finanzas"):
 
         items = data.get("data", [])
         if not items:
-            await ctx.send(embed=embed_info("Cierre de Caja", "Sin registros"))
+            await ctx.send(embed=from_template(_SIN_CIERRES))
             return
 
-        em = embed_ok(f"Cierres de Caja (ultimos {len(items)})")
-        for c in items:
-            fecha = c.get("fecha", "?")
-            total = format_money(c.get("monto_total"))
-            efectivo = format_money(c.get("monto_efectivo"))
-            transferencia = format_money(c.get("monto_transferencia"))
-            em.add_field(
-                name=f"{fecha}",
-                value=f"Total: {total}\nEfectivo: {efectivo}\nTransferencia: {transferencia}",
-                inline=True,
-            )
+        em = embed_fields(
+            f"Cierres de Caja (ultimos {len(items)})",
+            [(f"{c.get('fecha', '?')}", _detalle_cierre(c)) for c in items],
+        )
+        await ctx.send(embed=em)
 
+    @finanzas.command(name="dashboard")
+    async def finanzas_dashboard(self, ctx: commands.Context):
+        """Resumen, ultimo cierre de caja y costos en un solo embed."""
+        # Los tres GET son independientes: en paralelo tarda lo que el mas lento
+        resumen, caja, costos = await asyncio.gather(
+            self._get("/resumen"),
+            self._get("/caja", {"limit": 1}),
+            self._get("/costos"),
+        )
+
+        campos = [
+            ("Bruta Total", format_money(resumen.get("total_bruta"))),
+            ("Simple Total", format_money(resumen.get("total_simple"))),
+            ("Neta Total", format_money(resumen.get("total_neta"))),
+            ("Total Ventas", str(resumen.get("total_ventas", 0))),
+            ("Total Productos", str(resumen.get("total_productos", 0))),
+            ("Costos Mensuales", format_money(costos.get("total_mensual"))),
+        ]
+        cierres = caja.get("data", [])
+        if cierres:
+            c = cierres[0]
+            campos.append((f"Ultimo Cierre ({c.get('fecha', '?')})", _detalle_cierre(c), False))
+
+        em = embed_fields("Dashboard Financiero", campos)
         await ctx.send(embed=em)
 
 
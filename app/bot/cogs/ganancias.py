@@ -1,28 +1,30 @@
 """
-Cog de ganancias: !ganancia hoy|mes|rango|promedio
+Cog de ganancias: !ganancia hoy|mes|rango|promedio|full
 """
 
-import httpx
+import asyncio
+
 from discord.ext import commands
 
-from app.bot.formatters import embed_info, embed_ok, format_money
+from app.bot.formatters import embed_error, embed_fields, embed_info, format_money, from_template, info_template, parse_int
+from app.bot.httpcache import BaseAPIClientCog
+
+
+# Embeds estaticos: se construyen una vez al importar el cog
+_SIN_GANANCIAS_RANGO = info_template("Sin datos", "No hay ganancias en ese rango")
+_SIN_GANANCIAS = info_template("Sin datos", "No hay ganancias registradas")
 
 
-class GananciasCog(commands.Cog, name="Ganancias"):
+class GananciasCog(BaseAPIClientCog, name="Ganancias"):
     """Comandos para consultar ganancias."""
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.base = f"{bot.api_base}/api/ganancias"
-
-    async def _get(self, path: str, params: dict = None) -> dict:
-        async with httpx.AsyncClient() as client:
-            r = await client.get(f"{self.base}{path}", params=params, timeout=15)
-            return r.json()
+        self.base = "/api/ganancias"
 
     @commands.group(name="ganancia", invoke_without_command=True)
     async def ganancia(self, ctx: commands.Context):
-        """Consulta ganancias. Subcomandos: hoy, mes, rango, promedio"""
+        """Consulta ganancias. Subcomandos: hoy, mes, rango, promedio, full"""
         await ctx.send_help(ctx.command)
 
     @ganancia.command(name="hoy")
@@ -31,11 +33,15 @@ class GananciasCog(commands.Cog, name="Ganancias"):
         data = await self._get("/hoy")
         d = data.get("data")
         if d:
-            em = embed_ok(f"Ganancia - {data['fecha']}")
-            em.add_field(name="Bruta", value=format_money(d.get("ganancia_bruta")), inline=True)
-            em.add_field(name="Simple", value=format_money(d.get("ganancia_simple")), inline=True)
-            em.add_field(name="Neta", value=format_money(d.get("ganancia_neta")), inline=True)
-            em.set_footer(text=f"Costos diarios: {format_money(data.get('costos_diarios'))}")
+            em = embed_fields(
+                f"Ganancia - {data['fecha']}",
+                [
+                    ("Bruta", format_money(d.get("ganancia_bruta"))),
+                    ("Simple", format_money(d.get("ganancia_simple"))),
+                    ("Neta", format_money(d.get("ganancia_neta"))),
+                ],
+                footer=f"Costos diarios: {format_money(data.get('costos_diarios'))}",
+            )
         else:
             em = embed_info("Ganancia - Hoy", data.get("mensaje", "Sin datos"))
         await ctx.send(embed=em)
@@ -43,20 +49,29 @@ class GananciasCog(commands.Cog, name="Ganancias"):
     @ganancia.command(name="mes")
     async def ganancia_mes(self, ctx: commands.Context, mes: str = None, anio: str = None):
         """Ganancia del mes. Uso: !ganancia mes 1 2026"""
+        try:
+            mes, anio = parse_int(mes), parse_int(anio)
+        except ValueError as e:
+            await ctx.send(embed=embed_error(str(e)))
+            return
         params = {}
-        if mes:
-            params["mes"] = int(mes.strip("[]"))
-        if anio:
-            params["anio"] = int(anio.strip("[]"))
+        if mes is not None:
+            params["mes"] = mes
+        if anio is not None:
+            params["anio"] = anio
 
         data = await self._get("/mes", params)
 
-        em = embed_ok(f"Ganancias - {data.get('mes', '?')}/{data.get('anio', '?')}")
-        em.add_field(name="Bruta", value=format_money(data.get("total_bruta")), inline=True)
-        em.add_field(name="Simple", value=format_money(data.get("total_simple")), inline=True)
-        em.add_field(name="Neta", value=format_money(data.get("total_neta")), inline=True)
-        em.add_field(name="Dias con datos", value=str(data.get("dias_con_datos", 0)), inline=True)
-        em.set_footer(text=f"Costos diarios: {format_money(data.get('costos_diarios'))}")
+        em = embed_fields(
+            f"Ganancias - {data.get('mes', '?')}/{data.get('anio', '?')}",
+            [
+                ("Bruta", format_money(data.get("total_bruta"))),
+                ("Simple", format_money(data.get("total_simple"))),
+                ("Neta", format_money(data.get("total_neta"))),
+                ("Dias con datos", str(data.get("dias_con_datos", 0))),
+            ],
+            footer=f"Costos diarios: {format_money(data.get('costos_diarios'))}",
+        )
         await ctx.send(embed=em)
 
     @ganancia.command(name="rango")
@@ -70,20 +85,24 @@ class GananciasCog(commands.Cog, name="Ganancias"):
         r = data.get("resumen")
 
         if not r:
-            await ctx.send(embed=embed_info("Sin datos", "No hay ganancias en ese rango"))
+            await ctx.send(embed=from_template(_SIN_GANANCIAS_RANGO))
             return
 
-        em = embed_ok(f"Ganancias: {desde} a {hasta or 'hoy'}")
-        em.add_field(name="Dias", value=str(r["dias"]), inline=True)
-        em.add_field(name="\u200b", value="\u200b", inline=True)
-        em.add_field(name="\u200b", value="\u200b", inline=True)
-        em.add_field(name="Total Bruta", value=format_money(r["total_bruta"]), inline=True)
-        em.add_field(name="Total Simple", value=format_money(r["total_simple"]), inline=True)
-        em.add_field(name="Total Neta", value=format_money(r["total_neta"]), inline=True)
-        em.add_field(name="Prom. Bruta", value=format_money(r["promedio_bruta"]), inline=True)
-        em.add_field(name="Prom. Simple", value=format_money(r["promedio_simple"]), inline=True)
-        em.add_field(name="Prom. Neta", value=format_money(r["promedio_neta"]), inline=True)
-        em.set_footer(text=f"Costos diarios: {format_money(data.get('costos_diarios'))}")
+        em = embed_fields(
+            f"Ganancias: {desde} a {hasta or 'hoy'}",
+            [
+                ("Dias", str(r["dias"])),
+                ("\u200b", "\u200b"),
+                ("\u200b", "\u200b"),
+                ("Total Bruta", format_money(r["total_bruta"])),
+                ("Total Simple", format_money(r["total_simple"])),
+                ("Total Neta", format_money(r["total_neta"])),
+                ("Prom. Bruta", format_money(r["promedio_bruta"])),
+                ("Prom. Simple", format_money(r["promedio_simple"])),
+                ("Prom. Neta", format_money(r["promedio_neta"])),
+            ],
+            footer=f"Costos diarios: {format_money(data.get('costos_diarios'))}",
+        )
         await ctx.send(embed=em)
 
     @ganancia.command(name="promedio")
@@ -93,15 +112,45 @@ class GananciasCog(commands.Cog, name="Ganancias"):
         r = data.get("resumen")
 
         if not r:
-            await ctx.send(embed=embed_info("Sin datos", "No hay ganancias registradas"))
+            await ctx.send(embed=from_template(_SIN_GANANCIAS))
             return
 
-        em = embed_ok("Promedio de Ganancias")
-        em.add_field(name="Dias registrados", value=str(r["dias"]), inline=False)
-        em.add_field(name="Prom. Bruta", value=format_money(r["promedio_bruta"]), inline=True)
-        em.add_field(name="Prom. Simple", value=format_money(r["promedio_simple"]), inline=True)
-        em.add_field(name="Prom. Neta", value=format_money(r["promedio_neta"]), inline=True)
-        em.set_footer(text=f"Costos diarios: {format_money(data.get('costos_diarios'))}")
+        em = embed_fields(
+            "Promedio de Ganancias",
+            [
+                ("Dias registrados", str(r["dias"]), False),
+                ("Prom. Bruta", format_money(r["promedio_bruta"])),
+                ("Prom. Simple", format_money(r["promedio_simple"])),
+                ("Prom. Neta", format_money(r["promedio_neta"])),
+            ],
+            footer=f"Costos diarios: {format_money(data.get('costos_diarios'))}",
+        )
+        await ctx.send(embed=em)
+
+    @ganancia.command(name="full")
+    async def ganancia_full(self, ctx: commands.Context):
+        """Ganancia de hoy, del mes y promedio general en un solo embed."""
+        hoy, mes, resumen = await asyncio.gather(
+            self._get("/hoy"),
+            self._get("/mes"),
+            self._get("/resumen"),
+        )
+
+        d = hoy.get("data")
+        if d:
+            campos = [(f"Hoy ({hoy['fecha']})", format_money(d.get("ganancia_neta")))]
+        else:
+            campos = [("Hoy", hoy.get("mensaje", "Sin datos"))]
+        campos.append((f"Mes ({mes.get('mes', '?')}/{mes.get('anio', '?')})", format_money(mes.get("total_neta"))))
+        r = resumen.get("resumen")
+        if r:
+            campos.append((f"Prom. Neta ({r['dias']} dias)", format_money(r["promedio_neta"])))
+
+        em = embed_fields(
+            "Ganancias - Resumen Completo",
+            campos,
+            footer=f"Costos diarios: {format_money(mes.get('costos_diarios'))}",
+        )
         await ctx.send(embed=em)
 
 
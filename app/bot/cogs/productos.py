@@ -2,23 +2,23 @@
 Cog de productos: !producto buscar|info|stock
 """
 
-import httpx
+from operator import itemgetter
+
 from discord.ext import commands
 
-from app.bot.formatters import embed_error, embed_info, embed_ok, format_money, format_number
+from app.bot.formatters import embed_error, embed_fields, embed_info, embed_ok, format_money, format_number, parse_int
+from app.bot.httpcache import BaseAPIClientCog
+
+# /bajo-stock siempre devuelve estas columnas (labels fijos en la query)
+_CAMPOS_STOCK = itemgetter("nombre", "stock_disponible", "precio_venta")
 
 
-class ProductosCog(commands.Cog, name="Productos"):
+class ProductosCog(BaseAPIClientCog, name="Productos"):
     """Comandos para consultar productos."""
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.base = f"{bot.api_base}/api/productos"
-
-    async def _get(self, path: str, params: dict = None) -> dict:
-        async with httpx.AsyncClient() as client:
-            r = await client.get(f"{self.base}{path}", params=params, timeout=15)
-            return r.json()
+        self.base = "/api/productos"
 
     @commands.group(name="producto", invoke_without_command=True)
     async def producto(self, ctx: commands.Context):
@@ -36,13 +36,10 @@ class ProductosCog(commands.Cog, name="Productos"):
             return
 
         em = embed_ok(f"Productos: '{nombre}' ({data.get('total', len(items))} resultados)")
-        lines = []
-        for p in items[:15]:
-            precio = format_money(p.get("precio_venta"))
-            stock = format_number(p.get("cantidad"))
-            lines.append(f"**{p.get('nombre', '?')}** | {precio} | Stock: {stock}")
-
-        em.description = "\n".join(lines)
+        em.description = "\n".join(
+            f"**{p.get('nombre', '?')}** | {format_money(p.get('precio_venta'))} | Stock: {format_number(p.get('cantidad'))}"
+            for p in items[:15]
+        )
         await ctx.send(embed=em)
 
     @producto.command(name="info")
@@ -55,25 +52,31 @@ class ProductosCog(commands.Cog, name="Productos"):
             return
 
         p = data.get("data", {})
-        em = embed_ok(f"Producto: {p.get('nombre', '?')}")
-        em.add_field(name="ID", value=str(p.get("id", "?")), inline=True)
-        em.add_field(name="Precio Venta", value=format_money(p.get("precio_venta")), inline=True)
-        em.add_field(name="Costo Unitario", value=format_money(p.get("costo_unitario")), inline=True)
-        em.add_field(name="Margen", value=f"{p.get('margen_ganancia', '?')}%", inline=True)
-        em.add_field(name="Unidad", value=str(p.get("unidad_medida", "?")), inline=True)
-        em.add_field(name="Cantidad", value=format_number(p.get("cantidad")), inline=True)
-        em.add_field(name="Stock Total", value=format_number(p.get("stock_total")), inline=True)
-        em.add_field(name="Stock Disponible", value=format_number(p.get("stock_disponible")), inline=True)
-
+        campos = [
+            ("ID", str(p.get("id", "?"))),
+            ("Precio Venta", format_money(p.get("precio_venta"))),
+            ("Costo Unitario", format_money(p.get("costo_unitario"))),
+            ("Margen", f"{p.get('margen_ganancia', '?')}%"),
+            ("Unidad", str(p.get("unidad_medida", "?"))),
+            ("Cantidad", format_number(p.get("cantidad"))),
+            ("Stock Total", format_number(p.get("stock_total"))),
+            ("Stock Disponible", format_number(p.get("stock_disponible"))),
+        ]
         if p.get("es_divisible"):
-            em.add_field(name="Divisible", value=f"Si ({p.get('unidad_base', '')} x{p.get('unidad_factor', '')})", inline=True)
+            campos.append(("Divisible", f"Si ({p.get('unidad_base', '')} x{p.get('unidad_factor', '')})"))
 
-        await ctx.send(embed=em)
+        await ctx.send(embed=embed_fields(f"Producto: {p.get('nombre', '?')}", campos))
 
     @producto.command(name="stock")
     async def producto_stock(self, ctx: commands.Context, umbral: str = "5"):
         """Productos con bajo stock. Uso: !producto stock 5"""
-        data = await self._get("/bajo-stock", {"umbral": int(umbral.strip("[]"))})
+        try:
+            umbral = parse_int(umbral, 5)
+        except ValueError as e:
+            await ctx.send(embed=embed_error(str(e)))
+            return
+
+        data = await self._get("/bajo-stock", {"umbral": umbral})
         items = data.get("data", [])
 
         if not items:
@@ -81,14 +84,10 @@ class ProductosCog(commands.Cog, name="Productos"):
             return
 
         em = embed_ok(f"Bajo Stock (umbral: {umbral}) - {data.get('count', len(items))} productos")
-        lines = []
-        for p in items[:20]:
-            nombre = p.get("nombre", "?")
-            stock = p.get("stock_disponible", 0)
-            precio = format_money(p.get("precio_venta"))
-            lines.append(f"**{nombre}** | Stock: {stock} | {precio}")
-
-        em.description = "\n".join(lines)
+        em.description = "\n".join(
+            f"**{nombre}** | Stock: {stock} | {format_money(precio)}"
+            for nombre, stock, precio in map(_CAMPOS_STOCK, items[:20])
+        )
         await ctx.send(embed=em)
 
 
@@ -2,23 +2,27 @@
 Cog de ventas: !ventas hoy|dia|mes|top
 """
 
-import httpx
+from operator import itemgetter
+
 from discord.ext import commands
 
-from app.bot.formatters import embed_info, embed_ok, format_money, format_number
+from app.bot.formatters import embed_error, embed_fields, embed_ok, format_money, format_number, from_template, info_template, parse_int
+from app.bot.httpcache import BaseAPIClientCog
+
+
+# Embeds estaticos: se construyen una vez al importar el cog
+_SIN_TOP = info_template("Top Productos", "Sin datos")
 
+# /top-productos siempre devuelve estas columnas (labels fijos en la query)
+_CAMPOS_TOP = itemgetter("nombre", "total_vendido", "total_ingresos")
 
-class VentasCog(commands.Cog, name="Ventas"):
+
+class VentasCog(BaseAPIClientCog, name="Ventas"):
     """Comandos para consultar ventas."""
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.base = f"{bot.api_base}/api/ventas"
-
-    async def _get(self, path: str, params: dict = None) -> dict:
-        async with httpx.AsyncClient() as client:
-            r = await client.get(f"{self.base}{path}", params=params, timeout=15)
-            return r.json()
+        self.base = "/api/ventas"
 
     @commands.group(name="ventas", invoke_without_command=True)
     async def ventas(self, ctx: commands.Context):
@@ -40,25 +44,30 @@ class VentasCog(commands.Cog, name="Ventas"):
         """Ventas de un dia. Uso: !ventas dia 2026-01-15"""
         data = await self._get("/resumen/diario", {"fecha": fecha})
 
-        em = embed_ok(f"Ventas - {data.get('fecha', fecha)}")
-        em.add_field(name="Cantidad", value=format_number(data.get("cantidad_ventas")), inline=True)
-        em.add_field(name="Total", value=format_money(data.get("total_monto")), inline=True)
-
+        campos = [
+            ("Cantidad", format_number(data.get("cantidad_ventas"))),
+            ("Total", format_money(data.get("total_monto"))),
+        ]
         metodos = data.get("por_metodo_pago", {})
         if metodos:
             desglose = "\n".join(f"**{k}**: {format_money(v)}" for k, v in metodos.items())
-            em.add_field(name="Por metodo de pago", value=desglose, inline=False)
+            campos.append(("Por metodo de pago", desglose, False))
 
-        await ctx.send(embed=em)
+        await ctx.send(embed=embed_fields(f"Ventas - {data.get('fecha', fecha)}", campos))
 
     @ventas.command(name="mes")
     async def ventas_mes(self, ctx: commands.Context, mes: str = None, anio: str = None):
         """Ventas del mes. Uso: !ventas mes 1 2026"""
+        try:
+            mes, anio = parse_int(mes), parse_int(anio)
+        except ValueError as e:
+            await ctx.send(embed=embed_error(str(e)))
+            return
         params = {}
-        if mes:
-            params["mes"] = int(mes.strip("[]"))
-        if anio:
-            params["anio"] = int(anio.strip("[]"))
+        if mes is not None:
+            params["mes"] = mes
+        if anio is not None:
+            params["anio"] = anio
 
         data = await self._get("/mes", params)
 
@@ -70,22 +79,24 @@ class VentasCog(commands.Cog, name="Ventas"):
     @ventas.command(name="top")
     async def ventas_top(self, ctx: commands.Context, limit: str = "10"):
         """Top productos mas vendidos. Uso: !ventas top 10"""
-        data = await self._get("/top-productos", {"limit": min(int(limit.strip("[]")), 20)})
+        try:
+            limit = min(parse_int(limit, 10), 20)
+        except ValueError as e:
+            await ctx.send(embed=embed_error(str(e)))
+            return
+
+        data = await self._get("/top-productos", {"limit": limit})
 
         items = data.get("data", [])
         if not items:
-            await ctx.send(embed=embed_info("Top Productos", "Sin datos"))
+            await ctx.send(embed=from_template(_SIN_TOP))
             return
 
         em = embed_ok(f"Top {len(items)} Productos Mas Vendidos")
-        lines = []
-        for i, item in enumerate(items, 1):
-            nombre = item.get("nombre", "?")
-            vendido = format_number(item.get("total_vendido"))
-            ingresos = format_money(item.get("total_ingresos"))
-            lines.append(f"**{i}.** {nombre} - {vendido} uds ({ingresos})")
-
-        em.description = "\n".join(lines)
+        em.description = "\n".join(
+            f"**{i}.** {nombre} - {format_number(vendido)} uds ({format_money(ingresos)})"
+            for i, (nombre, vendido, ingresos) in enumerate(map(_CAMPOS_TOP, items), 1)
+        )
         await ctx.send(embed=em)
 
 
@@ -2,48 +2,144 @@
 Formateo de respuestas para Discord: Embeds y tablas.
 """
 
+import time
 from datetime import datetime
 from typing import Any
 
 import discord
 
+_FOOTER_PREFIX = "Manoli Bot | "
 
-def embed_ok(title: str, description: str = None, color: int = 0x2ECC71) -> discord.Embed:
+COLOR_OK = 0x2ECC71
+COLOR_ERROR = 0xE74C3C
+COLOR_INFO = 0x3498DB
+
+# Footer cacheado hasta el proximo cambio de minuto del reloj de pared.
+# El vencimiento se mide con time.monotonic(): solo se consulta la hora real
+# (datetime.now + strftime) una vez por minuto.
+_footer_deadline = 0.0
+_footer_cached = ""
+
+
+def _footer_text() -> str:
+    """Footer con fecha/hora, cacheado por minuto."""
+    global _footer_deadline, _footer_cached
+    mono = time.monotonic()
+    if mono >= _footer_deadline:
+        now = datetime.now()
+        _footer_cached = _FOOTER_PREFIX + now.strftime("%d/%m/%Y %H:%M")
+        # Alinear el vencimiento al inicio del minuto siguiente
+        _footer_deadline = mono + 60 - now.second - now.microsecond / 1_000_000
+    return _footer_cached
+
+
+def embed_ok(title: str, description: str = None, color: int = COLOR_OK) -> discord.Embed:
     """Crea un embed de exito."""
     em = discord.Embed(title=title, description=description, color=color)
-    em.set_footer(text=f"Manoli Bot | {datetime.now().strftime('%d/%m/%Y %H:%M')}")
+    em.set_footer(text=_footer_text())
     return em
 
 
+def embed_fields(
+    title: str,
+    fields: list[tuple],
+    description: str = None,
+    footer: str = None,
+    color: int = COLOR_OK,
+) -> discord.Embed:
+    """
+    Crea un embed de exito con todos sus campos de una vez via Embed.from_dict.
+    fields: tuplas (name, value) o (name, value, inline); inline por defecto True.
+    """
+    data = {
+        "type": "rich",
+        "title": title,
+        "color": color,
+        "fields": [
+            {"name": f[0], "value": f[1], "inline": f[2] if len(f) > 2 else True}
+            for f in fields
+        ],
+        "footer": {"text": footer if footer is not None else _footer_text()},
+    }
+    if description is not None:
+        data["description"] = description
+    return discord.Embed.from_dict(data)
+
+
 def embed_error(message: str) -> discord.Embed:
     """Crea un embed de error."""
-    em = discord.Embed(title="Error", description=message, color=0xE74C3C)
+    em = discord.Embed(title="Error", description=message, color=COLOR_ERROR)
     return em
 
 
 def embed_info(title: str, description: str = None) -> discord.Embed:
     """Crea un embed informativo."""
-    em = discord.Embed(title=title, description=description, color=0x3498DB)
-    em.set_footer(text=f"Manoli Bot | {datetime.now().strftime('%d/%m/%Y %H:%M')}")
+    em = discord.Embed(title=title, description=description, color=COLOR_INFO)
+    em.set_footer(text=_footer_text())
     return em
 
 
+def info_template(title: str, description: str) -> discord.Embed:
+    """
+    Embed informativo estatico, sin footer, para construir una vez al importar.
+    Se envia con from_template(), que copia y estampa el footer del minuto.
+    """
+    return discord.Embed(title=title, description=description, color=COLOR_INFO)
+
+
+def from_template(template: discord.Embed) -> discord.Embed:
+    """Copia un template de info_template() con el footer actual."""
+    em = template.copy()
+    em.set_footer(text=_footer_text())
+    return em
+
+
+_ZERO_MONEY = "$0.00"
+_ZERO_NUMBER = "0"
+
+
 def format_money(value: Any) -> str:
     """Formatea un valor monetario."""
+    # Fast-path por tipo exacto: float/int/None son lo que llega del JSON
+    if value is None:
+        return _ZERO_MONEY
+    if type(value) is float:
+        return f"${value:,.2f}"
+    if type(value) is int:
+        return f"${value:,}.00"
     try:
-        v = float(value or 0)
-        return f"${v:,.2f}"
+        return f"${float(value or 0):,.2f}"
     except (ValueError, TypeError):
-        return "$0.00"
+        return _ZERO_MONEY
 
 
 def format_number(value: Any) -> str:
     """Formatea un numero."""
+    if value is None:
+        return _ZERO_NUMBER
+    if type(value) is int:
+        return f"{value:,}"
     try:
-        v = int(float(value or 0))
-        return f"{v:,}"
+        return f"{int(float(value or 0)):,}"
     except (ValueError, TypeError):
-        return "0"
+        return _ZERO_NUMBER
+
+
+_BRACKETS = str.maketrans("", "", "[]")
+
+
+def parse_int(value: str | None, default: int | None = None) -> int | None:
+    """
+    Parsea un argumento entero de comando, tolerando corchetes (ej. "[5]").
+    Retorna default si falta; ValueError (con mensaje para el usuario) si
+    no es un numero.
+    """
+    if value is None:
+        return default
+    try:
+        return int(value.translate(_BRACKETS))
+    except ValueError:
+        raise ValueError(f"`{value}` no es un numero valido") from None
 
 
 def table_to_text(columns: list[str], rows: list[dict], max_rows: int = 20) -> str:
@@ -56,30 +152,27 @@ def table_to_text(columns: list[str], rows: list[dict], max_rows: int = 20) -> s
 
     display_rows = rows[:max_rows]
 
-    # Calcular anchos
-    widths = {}
+    # Una sola pasada: celdas ya convertidas y truncadas, agrupadas por columna
+    cells = []
     for col in columns:
-        widths[col] = len(col)
+        col_cells = []
         for row in display_rows:
             val = str(row.get(col, ""))
             if len(val) > 25:
                 val = val[:22] + "..."
-            widths[col] = max(widths[col], len(val))
+            col_cells.append(val)
+        cells.append(col_cells)
+
+    widths = [max(len(col), max(map(len, col_cells), default=0)) for col, col_cells in zip(columns, cells)]
 
     # Header
-    header = " | ".join(col.ljust(widths[col]) for col in columns)
-    separator = "-+-".join("-" * widths[col] for col in columns)
+    header = " | ".join(col.ljust(w) for col, w in zip(columns, widths))
+    separator = "-+-".join("-" * w for w in widths)
 
     # Rows
     lines = [header, separator]
-    for row in display_rows:
-        vals = []
-        for col in columns:
-            val = str(row.get(col, ""))
-            if len(val) > 25:
-                val = val[:22] + "..."
-            vals.append(val.ljust(widths[col]))
-        lines.append(" | ".join(vals))
+    for i in range(len(display_rows)):
+        lines.append(" | ".join(col_cells[i].ljust(w) for col_cells, w in zip(cells, widths)))
 
     if len(rows) > max_rows:
         lines.append(f"... (+{len(rows) - max_rows} filas mas)")
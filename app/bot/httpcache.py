@@ -0,0 +1,92 @@
+"""
+Base de los cogs que consultan la API: GET con cache TTL, limite de
+concurrencia, reintentos y timing.
+"""
+
+import asyncio
+import time
+
+import aiohttp
+import orjson
+from discord.ext import commands
+from loguru import logger
+
+from app.core.cache import TTLCache
+
+# Compartida por todos los cogs. Bot y API corren en el mismo proceso:
+# un rebuild de la DB (clear_all) la invalida junto con las caches de la API.
+_CACHE = TTLCache(ttl=30, maxsize=512)
+
+# Limita los GET concurrentes contra la API (comandos que usan asyncio.gather)
+_SEMAPHORE = asyncio.Semaphore(8)
+
+# GET en vuelo por clave: pedidos identicos concurrentes esperan el mismo resultado
+_INFLIGHT: dict[tuple, asyncio.Task] = {}
+
+# Reintentos ante errores de conexion (API reiniciando): espera 0.2s, 0.4s
+_RETRIES = 2
+_BACKOFF = 0.2
+
+# TTL por endpoint (segundos); el resto usa el default de la cache
+_TTLS = {
+    "/api/finanzas/costos": 300,
+    "/api/finanzas/impuestos": 300,
+    "/api/ganancias/hoy": 10,
+    "/api/ventas/hoy": 10,
+}
+
+
+def _done(key: tuple, task: asyncio.Task):
+    """Saca el GET de _INFLIGHT al terminar y marca su excepcion como leida."""
+    if _INFLIGHT.get(key) is task:
+        del _INFLIGHT[key]
+    if not task.cancelled():
+        # Evita el warning si todos los que esperaban fueron cancelados
+        task.exception()
+
+
+class BaseAPIClientCog(commands.Cog):
+    """
+    Cog base con _get() compartido; las subclases definen bot y base.
+    Solo se cachean respuestas 200: un 503 (DB no lista) se reintenta.
+    """
+
+    async def _get(self, path: str, params: dict = None) -> dict:
+        url = f"{self.base}{path}"
+        key = (url, tuple(sorted((params or {}).items())))
+
+        data = _CACHE.get(key)
+        if data is not None:
+            return data
+
+        task = _INFLIGHT.get(key)
+        if task is None:
+            # El GET corre en su propia task: no pertenece a ningun comando
+            task = asyncio.ensure_future(self._fetch_and_cache(key, url, params))
+            _INFLIGHT[key] = task
+            task.add_done_callback(lambda t: _done(key, t))
+        # shield: cancelar este comando (sea el primero o no) no cancela el GET compartido
+        return await asyncio.shield(task)
+
+    async def _fetch_and_cache(self, key: tuple, url: str, params: dict | None) -> dict:
+        """GET compartido por los pedidos identicos; cachea solo respuestas 200."""
+        data, status = await self._fetch(url, params)
+        if status == 200:
+            _CACHE.set(key, data, ttl=_TTLS.get(url))
+        return data
+
+    async def _fetch(self, url: str, params: dict | None) -> tuple[dict, int]:
+        """GET con reintentos ante errores de conexion; retorna (json, status)."""
+        inicio = time.perf_counter()
+        for intento in range(_RETRIES + 1):
+            try:
+                async with _SEMAPHORE, self.bot.api.get(url, params=params) as r:
+                    data = orjson.loads(await r.read())
+                    status = r.status
+                break
+            except aiohttp.ClientConnectionError:
+                if intento == _RETRIES:
+                    raise
+                await asyncio.sleep(_BACKOFF * 2**intento)
+        logger.debug("GET {} -> {} en {:.1f} ms", url, status, (time.perf_counter() - inicio) * 1000)
+        return data, status
@@ -1,16 +1,16 @@
+import os
+from dataclasses import dataclass, field, fields
 from pathlib import Path
-from typing import List, Optional
+from typing import FrozenSet
 
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from dotenv import load_dotenv
 
+# Igual que antes: las variables de entorno reales tienen prioridad sobre .env
+load_dotenv(".env", encoding="utf-8", override=False)
 
-class Settings(BaseSettings):
-    model_config = SettingsConfigDict(
-        env_file=".env",
-        env_file_encoding="utf-8",
-        extra="ignore",
-    )
 
+@dataclass(frozen=True, slots=True)
+class Settings:
     # Gmail IMAP
     gmail_email: str = ""
     gmail_app_password: str = ""
@@ -34,29 +34,51 @@ class Settings(BaseSettings):
     # Seguridad
     sql_max_rows: int = 100
 
-    @property
-    def db_path(self) -> Path:
-        return Path(self.database_path).resolve()
+    # Derivados: settings no cambia en runtime, se calculan una vez en __post_init__
+    db_path: Path = field(init=False)
+    json_file_path: Path = field(init=False)
+    allowed_channels: FrozenSet[int] = field(init=False)
+    admin_user_ids: FrozenSet[int] = field(init=False)
+    api_base_url: str = field(init=False)
 
-    @property
-    def json_file_path(self) -> Path:
-        return Path(self.json_path).resolve()
+    def __post_init__(self):
+        derived = {
+            "db_path": Path(self.database_path).resolve(),
+            "json_file_path": Path(self.json_path).resolve(),
+            "allowed_channels": _parse_ids(self.discord_allowed_channels),
+            "admin_user_ids": _parse_ids(self.discord_admin_user_ids),
+            "api_base_url": f"http://127.0.0.1:{self.api_port}",
+        }
+        for name, value in derived.items():
+            object.__setattr__(self, name, value)
 
-    @property
-    def allowed_channels(self) -> List[int]:
-        if not self.discord_allowed_channels:
-            return []
-        return [int(ch.strip()) for ch in self.discord_allowed_channels.split(",") if ch.strip()]
+    @classmethod
+    def from_env(cls) -> "Settings":
+        """
+        Crea Settings leyendo cada campo de la variable de entorno homonima.
+        Sin distinguir mayusculas (como pydantic-settings): DISCORD_TOKEN y
+        discord_token valen igual.
+        """
+        env = {name.lower(): value for name, value in os.environ.items()}
+        values = {}
+        for f in fields(cls):
+            if not f.init:
+                continue
+            raw = env.get(f.name)
+            if raw is None:
+                continue
+            if f.type is int:
+                if not raw.strip():
+                    continue
+                values[f.name] = int(raw)
+            else:
+                values[f.name] = raw
+        return cls(**values)
 
-    @property
-    def admin_user_ids(self) -> List[int]:
-        if not self.discord_admin_user_ids:
-            return []
-        return [int(uid.strip()) for uid in self.discord_admin_user_ids.split(",") if uid.strip()]
 
-    @property
-    def api_base_url(self) -> str:
-        return f"http://127.0.0.1:{self.api_port}"
+def _parse_ids(csv: str) -> FrozenSet[int]:
+    """Parsea IDs separados por coma a un frozenset (membership O(1) con `in`)."""
+    return frozenset(int(item.strip()) for item in csv.split(",") if item.strip())
 
 
-settings = Settings()
+settings = Settings.from_env()
@@ -0,0 +1,58 @@
+"""
+Cache en memoria con TTL para valores derivados de la DB.
+"""
+
+import threading
+import time
+from typing import Any, Hashable
+
+_registry: list["TTLCache"] = []
+_registry_lock = threading.Lock()
+
+
+class TTLCache:
+    """
+    Cache clave -> valor con expiracion por tiempo.
+    Thread-safe: los endpoints sync de FastAPI corren en un threadpool.
+    Todas las instancias se invalidan juntas con clear_all().
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 128):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: dict[Hashable, tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+        with _registry_lock:
+            _registry.append(self)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        expires, value = entry
+        if time.monotonic() >= expires:
+            with self._lock:
+                self._data.pop(key, None)
+            return default
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None):
+        """Guarda value; ttl permite sobreescribir el TTL de la instancia."""
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            if len(self._data) >= self.maxsize and key not in self._data:
+                # Descartar la entrada mas vieja (orden de insercion)
+                self._data.pop(next(iter(self._data)))
+            self._data[key] = (expires, value)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+def clear_all():
+    """Invalida todas las caches (llamar tras un rebuild de la DB)."""
+    with _registry_lock:
+        caches = list(_registry)
+    for cache in caches:
+        cache.clear()
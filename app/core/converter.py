@@ -1,150 +1,258 @@
 """
 SQLiteGenerator refactorizado desde main.py.
-Convierte JSON formato SNAP ORM a SQLite.
+Convierte JSON formato SNAP ORM a SQLite (orjson, o ijson en streaming si es grande).
 """
 
-import json
+import functools
+import itertools
+import os
 import re
 import sqlite3
 import threading
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Tuple
 
+import ijson
+import orjson
 from loguru import logger
 
 _rebuild_lock = threading.Lock()
 
+# Desde este tamano el JSON se parsea en streaming (ijson) en vez de entero (orjson)
+_STREAM_MIN_BYTES = 64 * 1024 * 1024
+
+# Indices para las consultas de la API: (nombre, tabla, columnas).
+# (producto_id, estado) cubre el COUNT agrupado de stock: index-only scan.
+# idx_vd_producto cubre el agregado de top_productos sin leer filas.
+_INDEXES = (
+    ("idx_stock_prod_estado", "stock_unidades", ("producto_id", "estado")),
+    ("idx_vd_producto", "ventas_detalle", ("producto_id", "cantidad", "subtotal")),
+)
+
+# PRAGMAs de build: el archivo es nuevo y solo lo usa este proceso hasta el swap.
+# journal_mode=MEMORY (no WAL) para no dejar -wal/-shm que el rename no se lleva.
+# foreign_keys=OFF explicito: el dump ya es consistente, no hay que verificar por fila.
+_BUILD_PRAGMAS = (
+    "foreign_keys=OFF",
+    "journal_mode=MEMORY",
+    "synchronous=NORMAL",
+    "temp_store=MEMORY",
+    "cache_size=-65536",
+    "mmap_size=2147483648",
+    "locking_mode=EXCLUSIVE",
+)
+
+
+def _connect_build(target: Path, **kwargs) -> sqlite3.Connection:
+    """Abre una conexion al archivo en construccion con _BUILD_PRAGMAS aplicados."""
+    conn = sqlite3.connect(str(target), **kwargs)
+    for pragma in _BUILD_PRAGMAS:
+        conn.execute(f"PRAGMA {pragma}")
+    return conn
+
+
+# Parametros por INSERT multi-fila: debajo del limite historico de SQLite (999)
+_MAX_PARAMS = 900
+
+
+@functools.lru_cache(maxsize=256)
+def _insert_sql(table_name: str, columns_sql: str, n_cols: int, n_rows: int) -> str:
+    """
+    INSERT con n_rows tuplas en VALUES: una sola ejecucion del statement para todas.
+    Cacheado: rebuilds con el mismo schema reusan el mismo string, y dentro de una
+    conexion el cache de statements de sqlite3 (por texto SQL) evita re-preparar.
+    """
+    values_tuple = "(" + ",".join("?" * n_cols) + ")"
+    return f"INSERT INTO `{table_name}` ({columns_sql}) VALUES " + ",".join([values_tuple] * n_rows)
+
+
+# Tablas de despacho de create_table_sql: se construyen una vez al importar
+_TYPE_MAPPING = {
+    "VARCHAR": "TEXT",
+    "INTEGER": "INTEGER",
+    "BOOLEAN": "INTEGER",
+    "TEXT": "TEXT",
+    "REAL": "REAL",
+    "BLOB": "BLOB",
+    "DATETIME": "TEXT",
+    "DATE": "TEXT",
+    "TIMESTAMP": "TEXT",
+}
+
+_SCALAR_DEFAULT_RE = re.compile(r"ScalarElementColumnDefault\('([^']+)'\)")
+_DEFAULT_OBJECT_MARKERS = ("ColumnDefault", "DefaultClause", "Scalar")
+_SQL_DEFAULT_KEYWORDS = frozenset({"NULL", "CURRENT_TIMESTAMP", "CURRENT_DATE", "CURRENT_TIME"})
+
+
+def _coerce(value: Any) -> Any:
+    """Normaliza un valor SNAP para SQLite: null/"NULL"/"" -> None, bool -> 0/1."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        return None if value.lower() == "null" else value
+    if isinstance(value, bool):
+        return 1 if value else 0
+    return value
+
+
+# Todas las variantes de mayusculas de "null" mas "": membership O(1) sin .lower()
+_NULL_STRINGS = frozenset(
+    {""} | {"".join(chars) for chars in itertools.product(*zip("null", "NULL"))}
+)
+
+
+def _coerce_number(value: Any) -> Any:
+    if type(value) is int or type(value) is float:
+        return value
+    return _coerce(value)
+
+
+def _coerce_bool(value: Any) -> Any:
+    if value is True:
+        return 1
+    if value is False:
+        return 0
+    return _coerce(value)
+
+
+def _coerce_text(value: Any) -> Any:
+    if type(value) is str:
+        return None if value in _NULL_STRINGS else value
+    return _coerce(value)
+
+
+# Coercion especializada por tipo SNAP de la columna: el caso esperado sale por
+# el primer chequeo y cualquier otro valor cae a _coerce (mismo resultado)
+_COERCERS = {
+    "INTEGER": _coerce_number,
+    "REAL": _coerce_number,
+    "BOOLEAN": _coerce_bool,
+    "VARCHAR": _coerce_text,
+    "TEXT": _coerce_text,
+    "DATETIME": _coerce_text,
+    "DATE": _coerce_text,
+    "TIMESTAMP": _coerce_text,
+}
+
+
+def _fsync_dir(path: Path):
+    """fsync del directorio para que el rename sobreviva a un corte (solo POSIX)."""
+    if os.name != "posix":
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
 
 class SQLiteGenerator:
     def __init__(self, json_file: str | Path, db_file: str | Path):
         self.json_file = Path(json_file)
         self.db_file = Path(db_file)
-        self.data = None
+        self.metadata = None
 
-    def load_json(self) -> Dict[str, Any]:
-        """Carga y valida el archivo JSON formato SNAP."""
+    def load_metadata(self) -> Dict[str, Any]:
+        """Lee solo la seccion metadata del JSON SNAP (sin cargar las tablas)."""
         if not self.json_file.exists():
             raise FileNotFoundError(f"El archivo JSON no existe: {self.json_file}")
 
-        with open(self.json_file, "r", encoding="utf-8") as f:
-            self.data = json.load(f)
-
-        required_keys = ["metadata", "tables"]
-        missing = [k for k in required_keys if k not in self.data]
-        if missing:
-            raise ValueError(f"Claves requeridas no encontradas: {', '.join(missing)}")
-
-        if not self.data["tables"]:
-            raise ValueError("La seccion 'tables' esta vacia")
+        with open(self.json_file, "rb") as f:
+            metadata = next(ijson.items(f, "metadata", use_float=True), None)
+        if metadata is None:
+            raise ValueError("Claves requeridas no encontradas: metadata")
 
-        metadata = self.data["metadata"]
+        self.metadata = metadata
         logger.info(
-            "JSON cargado: {} | {} tablas | {} filas | exportado: {}",
+            "JSON: {} | {} filas | exportado: {}",
             self.json_file.name,
-            len(self.data["tables"]),
             metadata.get("total_rows", "N/A"),
             metadata.get("exported_at", "N/A"),
         )
-        return self.data
+        return metadata
 
-    def validate_json_structure(self):
-        """Valida la estructura del JSON antes de procesar."""
-        issues = []
-        warnings = []
+    def iter_tables(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Recorre 'tables' tabla por tabla.
+        Hasta _STREAM_MIN_BYTES parsea todo con orjson (~2.5x mas rapido);
+        por encima usa ijson en streaming para que solo una tabla viva en
+        memoria a la vez. use_float=True para que los decimales lleguen como
+        float y no como Decimal, igual que con orjson.
+        """
+        if self.json_file.stat().st_size < _STREAM_MIN_BYTES:
+            tables = orjson.loads(self.json_file.read_bytes()).get("tables")
+            if isinstance(tables, dict):
+                yield from tables.items()
+            return
 
-        for table_name, table_info in self.data["tables"].items():
-            if "structure" not in table_info:
-                issues.append(f"Tabla '{table_name}': falta 'structure'")
-                continue
+        with open(self.json_file, "rb") as f:
+            yield from ijson.kvitems(f, "tables", use_float=True)
 
-            structure = table_info["structure"]
-            if not structure:
-                issues.append(f"Tabla '{table_name}': sin columnas definidas")
-                continue
+    def validate_table(self, table_name: str, table_info: Dict[str, Any]):
+        """Valida la estructura de una tabla antes de procesarla."""
+        issues = []
 
+        structure = table_info.get("structure")
+        if structure is None:
+            issues.append(f"Tabla '{table_name}': falta 'structure'")
+        elif not structure:
+            issues.append(f"Tabla '{table_name}': sin columnas definidas")
+        else:
             for i, col in enumerate(structure):
                 if "column_name" not in col:
                     issues.append(f"Tabla '{table_name}', col {i}: falta 'column_name'")
                 if "data_type" not in col:
                     issues.append(f"Tabla '{table_name}', col {i}: falta 'data_type'")
 
-            if "data" not in table_info:
-                warnings.append(f"Tabla '{table_name}': falta 'data'")
-            elif not table_info["data"]:
-                warnings.append(f"Tabla '{table_name}': datos vacios")
-
-            if "row_count" in table_info and "data" in table_info:
-                expected = table_info["row_count"]
-                actual = len(table_info["data"]) if table_info["data"] else 0
-                if expected != actual:
-                    warnings.append(
-                        f"Tabla '{table_name}': row_count ({expected}) != datos ({actual})"
-                    )
-
         if issues:
             for issue in issues:
                 logger.error(issue)
             raise ValueError("JSON tiene problemas estructurales")
 
-        for w in warnings:
-            logger.warning(w)
-
-        total = sum(len(t.get("data", [])) for t in self.data["tables"].values())
-        logger.info("Estructura valida: {} tablas, {} registros", len(self.data["tables"]), total)
+        if "data" not in table_info:
+            logger.warning("Tabla '{}': falta 'data'", table_name)
+        elif not table_info["data"]:
+            logger.warning("Tabla '{}': datos vacios", table_name)
+
+        if "row_count" in table_info and "data" in table_info:
+            expected = table_info["row_count"]
+            actual = len(table_info["data"]) if table_info["data"] else 0
+            if expected != actual:
+                logger.warning(
+                    "Tabla '{}': row_count ({}) != datos ({})", table_name, expected, actual
+                )
 
     def map_snap_column_type(self, snap_type: str) -> str:
         """Mapea tipos del formato SNAP a SQLite."""
         if not snap_type:
             return "TEXT"
-
-        snap_type = snap_type.upper()
-
-        type_mapping = {
-            "VARCHAR": "TEXT",
-            "INTEGER": "INTEGER",
-            "BOOLEAN": "INTEGER",
-            "TEXT": "TEXT",
-            "REAL": "REAL",
-            "BLOB": "BLOB",
-            "DATETIME": "TEXT",
-            "DATE": "TEXT",
-            "TIMESTAMP": "TEXT",
-        }
-
-        return type_mapping.get(snap_type, "TEXT")
+        return _TYPE_MAPPING.get(snap_type.upper(), "TEXT")
 
     def process_default_value(self, default_val: Any) -> str:
         """Procesa valores por defecto y los convierte a SQL valido."""
         if default_val is None:
             return "NULL"
 
+        # Numericos primero: no necesitan ninguno de los chequeos de texto
+        if isinstance(default_val, bool):
+            return "1" if default_val else "0"
+        if isinstance(default_val, (int, float)):
+            return str(default_val)
+
         default_str = str(default_val)
 
         if "ScalarElementColumnDefault" in default_str:
-            match = re.search(r"ScalarElementColumnDefault\('([^']+)'\)", default_str)
+            match = _SCALAR_DEFAULT_RE.search(default_str)
             if match:
                 return f"'{match.group(1)}'"
             return "NULL"
 
-        if any(
-            obj_type in default_str
-            for obj_type in ["ColumnDefault", "DefaultClause", "Scalar"]
-        ):
+        if any(obj_type in default_str for obj_type in _DEFAULT_OBJECT_MARKERS):
             return "NULL"
 
-        if default_str.upper() in [
-            "NULL",
-            "CURRENT_TIMESTAMP",
-            "CURRENT_DATE",
-            "CURRENT_TIME",
-        ]:
-            return default_str.upper()
-
-        if isinstance(default_val, bool):
-            return "1" if default_val else "0"
-
-        if isinstance(default_val, (int, float)):
-            return str(default_val)
+        upper = default_str.upper()
+        if upper in _SQL_DEFAULT_KEYWORDS:
+            return upper
 
         if isinstance(default_val, str):
             escaped_val = default_str.replace("'", "''")
@@ -183,94 +291,110 @@ class SQLiteGenerator:
         columns_sql = ",\n    ".join(column_definitions)
         return f"CREATE TABLE `{table_name}` (\n    {columns_sql}\n);"
 
-    def create_database(self, db_path: Path | None = None):
-        """Crea la base de datos SQLite con todas las tablas."""
+    def build_database(self, db_path: Path | None = None):
+        """
+        Crea la base en una sola pasada sobre el JSON: por cada tabla emite
+        el CREATE TABLE e inserta sus filas antes de leer la siguiente.
+        Todo en una transaccion explicita.
+        """
         target = db_path or self.db_file
 
         if target.exists():
             target.unlink()
 
-        conn = sqlite3.connect(str(target))
+        # isolation_level=None: la transaccion se maneja explicitamente
+        conn = _connect_build(target, isolation_level=None, cached_statements=512)
         cursor = conn.cursor()
 
         try:
-            for table_name, table_info in self.data["tables"].items():
-                if "structure" not in table_info:
-                    continue
+            total_tables = 0
+            total_inserted = 0
+            cursor.execute("BEGIN IMMEDIATE")
 
-                structure = table_info["structure"]
-                create_sql = self.create_table_sql(table_name, structure)
-                cursor.execute(create_sql)
+            for table_name, table_info in self.iter_tables():
+                self.validate_table(table_name, table_info)
+                cursor.execute(self.create_table_sql(table_name, table_info["structure"]))
+                total_tables += 1
 
-                actual_count = len(table_info.get("data", []))
+                inserted = self._insert_rows(
+                    cursor, table_name, table_info["structure"], table_info.get("data")
+                )
+                total_inserted += inserted
                 logger.debug(
-                    "Tabla {}: {} columnas, {} registros",
+                    "Tabla {}: {} columnas, {} registros insertados",
                     table_name,
-                    len(structure),
-                    actual_count,
+                    len(table_info["structure"]),
+                    inserted,
                 )
 
-            conn.commit()
-            logger.info("Todas las tablas creadas exitosamente")
+            if not total_tables:
+                raise ValueError("La seccion 'tables' esta vacia o no existe")
+
+            cursor.execute("COMMIT")
+            logger.info(
+                "DB construida: {} tablas, {} registros totales", total_tables, total_inserted
+            )
         except Exception as e:
-            conn.rollback()
-            raise Exception(f"Error creando tablas: {e}")
+            if conn.in_transaction:
+                cursor.execute("ROLLBACK")
+            raise Exception(f"Error construyendo DB: {e}")
         finally:
             conn.close()
 
-    def insert_data(self, db_path: Path | None = None):
-        """Inserta los datos en las tablas."""
+    def _insert_rows(
+        self,
+        cursor: sqlite3.Cursor,
+        table_name: str,
+        structure: List[Dict[str, Any]],
+        table_data: Any,
+    ) -> int:
+        """Inserta las filas de una tabla; retorna cuantas se insertaron."""
+        if not isinstance(table_data, list) or not table_data:
+            return 0
+
+        first_record = table_data[0]
+        if not isinstance(first_record, dict):
+            return 0
+
+        columns = list(first_record.keys())
+        if not columns:
+            return 0
+        columns_sql = ", ".join([f"`{col}`" for col in columns])
+        rows_per_stmt = max(1, _MAX_PARAMS // len(columns))
+        insert_sql = _insert_sql(table_name, columns_sql, len(columns), rows_per_stmt)
+
+        snap_types = {
+            col.get("column_name"): str(col.get("data_type") or "").upper() for col in structure
+        }
+        coercers = [(col, _COERCERS.get(snap_types.get(col), _coerce)) for col in columns]
+        rows = (
+            tuple([conv(record.get(col)) for col, conv in coercers])
+            for record in table_data
+            if isinstance(record, dict)
+        )
+        inserted = 0
+        while chunk := list(itertools.islice(rows, rows_per_stmt)):
+            if len(chunk) < rows_per_stmt:
+                # Resto final: template con las filas que quedan
+                insert_sql = _insert_sql(table_name, columns_sql, len(columns), len(chunk))
+            cursor.execute(insert_sql, list(itertools.chain.from_iterable(chunk)))
+            inserted += len(chunk)
+        return inserted
+
+    def create_indexes(self, db_path: Path | None = None):
+        """Crea los indices de _INDEXES cuyas tablas y columnas existan."""
         target = db_path or self.db_file
 
-        conn = sqlite3.connect(str(target))
-        cursor = conn.cursor()
-
+        conn = _connect_build(target)
         try:
-            total_inserted = 0
-
-            for table_name, table_info in self.data["tables"].items():
-                table_data = table_info.get("data", [])
-                if not table_data:
-                    continue
-
-                if not isinstance(table_data, list) or not table_data:
+            for index_name, table_name, columns in _INDEXES:
+                existentes = {row[1] for row in conn.execute(f"PRAGMA table_info(`{table_name}`)")}
+                if not set(columns) <= existentes:
                     continue
-
-                first_record = table_data[0]
-                if not isinstance(first_record, dict):
-                    continue
-
-                columns = list(first_record.keys())
-                placeholders = ", ".join(["?" for _ in columns])
-                columns_sql = ", ".join([f"`{col}`" for col in columns])
-                insert_sql = f"INSERT INTO `{table_name}` ({columns_sql}) VALUES ({placeholders})"
-
-                rows_to_insert = []
-                for record in table_data:
-                    if not isinstance(record, dict):
-                        continue
-                    row = []
-                    for col in columns:
-                        value = record.get(col)
-                        if value is None or value == "NULL" or value == "":
-                            value = None
-                        elif isinstance(value, str) and value.lower() == "null":
-                            value = None
-                        elif isinstance(value, bool):
-                            value = 1 if value else 0
-                        row.append(value)
-                    rows_to_insert.append(row)
-
-                if rows_to_insert:
-                    cursor.executemany(insert_sql, rows_to_insert)
-                    total_inserted += len(rows_to_insert)
-                    logger.debug("Tabla {}: {} registros insertados", table_name, len(rows_to_insert))
-
+                columns_sql = ", ".join(f"`{col}`" for col in columns)
+                conn.execute(f"CREATE INDEX IF NOT EXISTS `{index_name}` ON `{table_name}` ({columns_sql})")
+                logger.debug("Indice creado: {}", index_name)
             conn.commit()
-            logger.info("Datos insertados: {} registros totales", total_inserted)
-        except Exception as e:
-            conn.rollback()
-            raise Exception(f"Error insertando datos: {e}")
         finally:
             conn.close()
 
@@ -278,10 +402,9 @@ class SQLiteGenerator:
         """Ejecuta el proceso completo de generacion."""
         logger.info("Iniciando generacion de DB: {} -> {}", self.json_file.name, self.db_file.name)
 
-        self.load_json()
-        self.validate_json_structure()
-        self.create_database()
-        self.insert_data()
+        self.load_metadata()
+        self.build_database()
+        self.create_indexes()
 
         size_kb = self.db_file.stat().st_size / 1024
         logger.info("DB creada exitosamente: {:.1f} KB", size_kb)
@@ -300,15 +423,13 @@ class SQLiteGenerator:
             tmp_db = self.db_file.parent / "database_tmp.db"
             logger.info("Rebuild iniciado -> {}", tmp_db.name)
 
-            self.load_json()
-            self.validate_json_structure()
-            self.create_database(db_path=tmp_db)
-            self.insert_data(db_path=tmp_db)
+            self.load_metadata()
+            self.build_database(db_path=tmp_db)
+            self.create_indexes(db_path=tmp_db)
 
-            # Swap atomico
-            if self.db_file.exists():
-                self.db_file.unlink()
-            tmp_db.rename(self.db_file)
+            # Swap atomico: replace pisa el destino en un solo paso (sin ventana sin DB)
+            tmp_db.replace(self.db_file)
+            _fsync_dir(self.db_file.parent)
 
             size_kb = self.db_file.stat().st_size / 1024
             logger.info("Rebuild completado: {:.1f} KB", size_kb)
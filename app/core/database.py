@@ -2,14 +2,18 @@
 Engine SQLAlchemy con automap para reflexion dinamica de tablas.
 """
 
+import functools
+import re
 import threading
 
 from loguru import logger
 from sqlalchemy import create_engine, event, text
 from sqlalchemy.ext.automap import automap_base
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
 
 from app.config import settings
+from app.core.cache import clear_all as clear_caches
 
 _lock = threading.Lock()
 
@@ -17,19 +21,48 @@ engine = None
 SessionLocal = None
 Base = None
 _table_names: list[str] = []
+# DDL de sqlite_master en la ultima reflexion: si no cambia, se reusa Base
+_schema: tuple = ()
 
 
-def _set_wal_mode(dbapi_conn, connection_record):
-    """Activa WAL mode y busy_timeout para lecturas concurrentes."""
+_POOL_SIZE = 8
+_MAX_OVERFLOW = 8
+
+# Se aplican una vez por conexion fisica; el pool las reutiliza entre requests
+_PRAGMAS = (
+    "journal_mode=WAL",
+    "busy_timeout=5000",
+    "synchronous=NORMAL",
+    "cache_size=-65536",
+    "temp_store=MEMORY",
+    "mmap_size=268435456",
+)
+
+
+def _set_pragmas(dbapi_conn, connection_record):
+    """Activa WAL mode, busy_timeout y cache/mmap para lecturas concurrentes."""
     cursor = dbapi_conn.cursor()
-    cursor.execute("PRAGMA journal_mode=WAL")
-    cursor.execute("PRAGMA busy_timeout=5000")
+    for pragma in _PRAGMAS:
+        cursor.execute(f"PRAGMA {pragma}")
     cursor.close()
 
 
+def _read_schema(conn) -> tuple:
+    """DDL de todas las tablas e indices en una sola consulta."""
+    return tuple(
+        conn.execute(
+            text("SELECT type, name, tbl_name, sql FROM sqlite_master ORDER BY type, name")
+        )
+    )
+
+
 def init_engine():
-    """Inicializa el engine SQLAlchemy y refleja las tablas."""
-    global engine, SessionLocal, Base, _table_names
+    """
+    Inicializa el engine SQLAlchemy y refleja las tablas.
+    Si el schema es el mismo que en la reflexion anterior (lo normal en un
+    rebuild: cambian los datos, no las tablas) reusa Base sin re-reflejar.
+    """
+    global engine, SessionLocal, Base, _table_names, _schema
 
     db_path = settings.db_path
     if not db_path.exists():
@@ -38,20 +71,38 @@ def init_engine():
 
     db_url = f"sqlite:///{db_path}"
 
+    # Cerrar las conexiones del engine anterior: apuntan al archivo reemplazado
+    if engine is not None:
+        engine.dispose()
+
     engine = create_engine(
         db_url,
         connect_args={"check_same_thread": False},
-        pool_pre_ping=True,
+        poolclass=QueuePool,
+        pool_size=_POOL_SIZE,
+        max_overflow=_MAX_OVERFLOW,
+        pool_pre_ping=False,
     )
-    event.listen(engine, "connect", _set_wal_mode)
+    event.listen(engine, "connect", _set_pragmas)
+
+    with engine.connect() as conn:
+        schema = _read_schema(conn)
+
+    SessionLocal = sessionmaker(bind=engine, expire_on_commit=False)
+
+    if Base is not None and schema == _schema:
+        logger.info("Automap: schema sin cambios, se reusan {} tablas", len(_table_names))
+        return True
 
     Base = automap_base()
     Base.prepare(autoload_with=engine)
+    _schema = schema
 
     _table_names = list(Base.metadata.tables.keys())
     logger.info("Automap: {} tablas reflejadas: {}", len(_table_names), _table_names)
 
-    SessionLocal = sessionmaker(bind=engine, expire_on_commit=False)
+    # Las Table cacheadas pertenecen a la metadata anterior
+    get_table.cache_clear()
     return True
 
 
@@ -60,6 +111,7 @@ def refresh():
     with _lock:
         logger.info("Refrescando automap...")
         init_engine()
+        clear_caches()
 
 
 def get_session() -> Session:
@@ -74,13 +126,22 @@ def get_table_names() -> list[str]:
     return list(_table_names)
 
 
+@functools.lru_cache(maxsize=64)
 def get_table(name: str):
-    """Retorna un objeto Table por nombre."""
+    """Retorna un objeto Table por nombre (cacheado hasta el proximo init_engine)."""
     if Base is None:
         return None
     return Base.metadata.tables.get(name)
 
 
+# Palabras prohibidas y tabla usuarios en un solo patron precompilado:
+# una sola pasada lineal sobre la consulta en vez de split() + un chequeo por palabra
+_FORBIDDEN_SQL = re.compile(
+    r"\b(?P<palabra>DROP|DELETE|UPDATE|INSERT|ALTER|CREATE|REPLACE|ATTACH)\b|(?P<tabla>USUARIOS)",
+    re.IGNORECASE,
+)
+
+
 def execute_raw_sql(query: str, max_rows: int | None = None) -> dict:
     """
     Ejecuta una consulta SELECT y retorna resultados como dict.
@@ -92,14 +153,12 @@ def execute_raw_sql(query: str, max_rows: int | None = None) -> dict:
     if not query_upper.startswith("SELECT"):
         raise ValueError("Solo se permiten consultas SELECT")
 
-    forbidden = ["DROP", "DELETE", "UPDATE", "INSERT", "ALTER", "CREATE", "REPLACE", "ATTACH"]
-    for word in forbidden:
-        if word in query_upper.split():
-            raise ValueError(f"Palabra prohibida en consulta: {word}")
-
-    # Bloquear acceso a tabla usuarios
-    if "USUARIOS" in query_upper:
-        raise ValueError("Acceso a tabla 'usuarios' no permitido")
+    match = _FORBIDDEN_SQL.search(query_stripped)
+    if match is not None:
+        # Bloquear acceso a tabla usuarios
+        if match.lastgroup == "tabla":
+            raise ValueError("Acceso a tabla 'usuarios' no permitido")
+        raise ValueError(f"Palabra prohibida en consulta: {match.group().upper()}")
 
     limit = max_rows or settings.sql_max_rows
     if "LIMIT" not in query_upper:
@@ -109,7 +168,10 @@ def execute_raw_sql(query: str, max_rows: int | None = None) -> dict:
     try:
         result = session.execute(text(query_stripped))
         columns = list(result.keys())
-        rows = [dict(zip(columns, row)) for row in result.fetchall()]
+        # fetchmany acota en el cursor aunque la consulta traiga su propio LIMIT
+        # (o "LIMIT" aparezca en un nombre y no se haya agregado el nuestro).
+        # dict(zip) sobre las tuplas: mas rapido que result.mappings()
+        rows = [dict(zip(columns, row)) for row in result.fetchmany(limit)]
         return {"columns": columns, "rows": rows, "count": len(rows)}
     finally:
         session.close()
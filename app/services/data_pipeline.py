@@ -10,7 +10,7 @@ from loguru import logger
 from app.config import settings
 from app.core.converter import SQLiteGenerator
 from app.core.database import refresh as refresh_db
-from app.services.gmail import fetch_latest_backup
+from app.services.gmail import fetch_latest_backup, save_backup_hash
 
 
 def _run_pipeline_sync() -> bool:
@@ -21,7 +21,8 @@ def _run_pipeline_sync() -> bool:
     logger.info("Pipeline iniciado")
 
     # 1. Buscar email nuevo
-    json_path = fetch_latest_backup()
+    backup = fetch_latest_backup()
+    json_path, digest = backup if backup is not None else (None, None)
 
     if json_path is None:
         logger.info("Sin datos nuevos, verificando JSON existente...")
@@ -44,6 +45,11 @@ def _run_pipeline_sync() -> bool:
         logger.warning("Rebuild no completado (posiblemente ya en progreso)")
         return False
 
+    # El hash solo se registra con la DB ya al dia: un rebuild fallido no
+    # debe hacer que el mismo backup se salte por "identico" al reenviarlo
+    if digest is not None:
+        save_backup_hash(digest)
+
     # 3. Refrescar automap
     refresh_db()
     logger.info("Pipeline completado exitosamente")
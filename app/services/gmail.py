@@ -3,21 +3,29 @@ Servicio IMAP: buscar email, descargar adjunto, descomprimir.
 """
 
 import email
+import email.policy
 import gzip
+import hashlib
 import imaplib
-import json
+import io
+import itertools
+import shutil
 import tarfile
-import tempfile
-from email.header import decode_header
+from email.message import EmailMessage
 from pathlib import Path
 from typing import Optional
 
+import ijson
+import orjson
 from loguru import logger
 
 from app.config import settings
 
 _last_processed_uid: Optional[str] = None
 
+# Hasta este tamano la validacion carga el JSON entero con orjson
+_VALIDATE_IN_MEMORY_MAX = 64 * 1024 * 1024
+
 
 def _connect() -> imaplib.IMAP4_SSL:
     """Conecta a Gmail via IMAP SSL."""
@@ -26,23 +34,39 @@ def _connect() -> imaplib.IMAP4_SSL:
     return mail
 
 
-def _decode_header_value(value: str) -> str:
-    """Decodifica un header de email."""
-    decoded_parts = decode_header(value)
-    result = []
-    for part, charset in decoded_parts:
-        if isinstance(part, bytes):
-            result.append(part.decode(charset or "utf-8", errors="replace"))
-        else:
-            result.append(part)
-    return "".join(result)
+def _find_attachment(msg: EmailMessage) -> Optional[EmailMessage]:
+    """
+    Primer adjunto .gz/.tar.gz/.json. Prueba los adjuntos directos
+    (iter_attachments) y solo si no hay recorre el arbol MIME completo,
+    para emails reenviados con el adjunto anidado.
+    Con policy.default get_filename() ya viene decodificado.
+    """
+    for part in itertools.chain(msg.iter_attachments(), msg.walk()):
+        filename = part.get_filename()
+        if filename and filename.endswith((".gz", ".tar.gz", ".json")):
+            return part
+    return None
+
+
+def _hash_path() -> Path:
+    """Archivo con el digest del ultimo backup convertido, junto al JSON."""
+    return settings.json_file_path.with_name(".last_hash")
+
 
+def save_backup_hash(digest: str):
+    """
+    Registra el digest del backup ya convertido a DB. Llamar solo tras un
+    rebuild exitoso: si no, reenviar el mismo backup lo saltaria por identico.
+    """
+    _hash_path().write_text(digest)
 
-def fetch_latest_backup() -> Optional[Path]:
+
+def fetch_latest_backup() -> Optional[tuple[Path, str]]:
     """
     Busca el email mas reciente con el subject configurado,
     descarga el adjunto y lo descomprime a JSON.
-    Retorna el Path al JSON o None si no hay email nuevo.
+    Retorna (Path al JSON, digest) o None si no hay email nuevo.
+    El digest se guarda con save_backup_hash() despues del rebuild.
     """
     global _last_processed_uid
 
@@ -56,7 +80,12 @@ def fetch_latest_backup() -> Optional[Path]:
         mail.select("INBOX")
 
         subject = settings.gmail_search_subject
-        status, data = mail.uid("search", None, f'(SUBJECT "{subject}")')
+        criteria = [f'SUBJECT "{subject}"']
+        if _last_processed_uid is not None:
+            # Solo UIDs posteriores al ultimo procesado: la respuesta no crece con el buzon.
+            # "n:*" siempre incluye el UID mas alto, que el chequeo de abajo descarta
+            criteria.append(f"UID {int(_last_processed_uid) + 1}:*")
+        status, data = mail.uid("search", None, f"({' '.join(criteria)})")
 
         if status != "OK" or not data[0]:
             logger.info("No se encontraron emails con subject: {}", subject)
@@ -76,23 +105,12 @@ def fetch_latest_backup() -> Optional[Path]:
             logger.error("Error descargando email UID: {}", latest_uid)
             return None
 
-        msg = email.message_from_bytes(msg_data[0][1])
+        msg = email.message_from_bytes(msg_data[0][1], policy=email.policy.default)
 
         # Buscar adjunto
-        attachment_data = None
-        attachment_name = None
-
-        for part in msg.walk():
-            if part.get_content_maintype() == "multipart":
-                continue
-
-            filename = part.get_filename()
-            if filename:
-                filename = _decode_header_value(filename)
-                if filename.endswith((".gz", ".tar.gz", ".json")):
-                    attachment_data = part.get_payload(decode=True)
-                    attachment_name = filename
-                    break
+        attachment = _find_attachment(msg)
+        attachment_data = attachment.get_payload(decode=True) if attachment else None
+        attachment_name = attachment.get_filename() if attachment else None
 
         if not attachment_data:
             logger.warning("Email sin adjunto valido (.gz/.tar.gz/.json)")
@@ -100,23 +118,37 @@ def fetch_latest_backup() -> Optional[Path]:
 
         logger.info("Adjunto descargado: {} ({:.1f} KB)", attachment_name, len(attachment_data) / 1024)
 
-        # Descomprimir
-        json_data = _decompress(attachment_data, attachment_name)
-        if json_data is None:
-            return None
-
-        # Guardar JSON formateado
+        # Descomprimir directo a un temporal junto al destino (sin pasar por memoria)
         output_path = settings.json_file_path
         output_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = output_path.with_name(output_path.name + ".tmp")
 
-        parsed = json.loads(json_data)
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(parsed, f, indent=3, ensure_ascii=False)
+        if not _decompress(attachment_data, attachment_name, tmp_path):
+            tmp_path.unlink(missing_ok=True)
+            return None
+
+        # Mismo contenido que el ultimo backup: no hace falta rebuild
+        hash_path = _hash_path()
+        with open(tmp_path, "rb") as f:
+            digest = hashlib.file_digest(f, lambda: hashlib.blake2b(digest_size=16)).hexdigest()
+        if output_path.exists() and hash_path.exists() and hash_path.read_text() == digest:
+            tmp_path.unlink()
+            logger.info("Backup identico al anterior (UID: {}), saltando", latest_uid)
+            _last_processed_uid = latest_uid
+            return None
+
+        # Validar antes de pisar el JSON anterior
+        try:
+            _validate_json(tmp_path)
+        except Exception:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        tmp_path.replace(output_path)
 
         logger.info("JSON guardado: {} ({:.1f} KB)", output_path.name, output_path.stat().st_size / 1024)
 
         _last_processed_uid = latest_uid
-        return output_path
+        return output_path, digest
 
     except imaplib.IMAP4.error as e:
         logger.error("Error IMAP: {}", e)
@@ -133,37 +165,53 @@ def fetch_latest_backup() -> Optional[Path]:
                 pass
 
 
-def _decompress(data: bytes, filename: str) -> Optional[bytes]:
-    """Descomprime .gz o .tar.gz y retorna el contenido JSON como bytes."""
+def _validate_json(path: Path):
+    """
+    Valida el JSON: con orjson si entra comodo en memoria, si no recorriendolo
+    con ijson sin cargarlo entero.
+    """
+    if path.stat().st_size < _VALIDATE_IN_MEMORY_MAX:
+        orjson.loads(path.read_bytes())
+        return
+    with open(path, "rb") as f:
+        for _ in ijson.basic_parse(f):
+            pass
+
+
+def _decompress(data: bytes, filename: str, dest: Path) -> bool:
+    """
+    Descomprime .gz o .tar.gz y escribe el contenido JSON en dest.
+    Copia en streaming con copyfileobj: el JSON descomprimido nunca esta
+    entero en memoria. Retorna True si se escribio dest.
+    """
     try:
         if filename.endswith(".tar.gz"):
-            import io
-
             with tarfile.open(fileobj=io.BytesIO(data), mode="r:gz") as tar:
-                for member in tar.getmembers():
-                    if member.name.endswith(".json"):
-                        f = tar.extractfile(member)
-                        if f:
-                            return f.read()
-                # Si no hay .json, extraer el primer archivo
                 members = tar.getmembers()
-                if members:
-                    f = tar.extractfile(members[0])
+                # Preferir el .json; si no hay, el primer archivo
+                candidates = [m for m in members if m.name.endswith(".json")] + members[:1]
+                for member in candidates:
+                    f = tar.extractfile(member)
                     if f:
-                        return f.read()
+                        with f, open(dest, "wb") as out:
+                            shutil.copyfileobj(f, out)
+                        return True
             logger.error("No se encontro contenido en tar.gz")
-            return None
+            return False
 
         elif filename.endswith(".gz"):
-            return gzip.decompress(data)
+            with gzip.open(io.BytesIO(data)) as f, open(dest, "wb") as out:
+                shutil.copyfileobj(f, out)
+            return True
 
         elif filename.endswith(".json"):
-            return data
+            dest.write_bytes(data)
+            return True
 
         else:
             logger.error("Formato no soportado: {}", filename)
-            return None
+            return False
 
     except Exception as e:
         logger.error("Error descomprimiendo {}: {}", filename, e)
-        return None
+        return False
@@ -4,19 +4,69 @@ Script para crear una base de datos SQLite3 desde un archivo JSON
 formato SNAP ORM que contiene tanto la estructura como los datos.
 """
 
-import json
+import itertools
+import re
 import sqlite3
 import sys
 import os
+from operator import itemgetter
 from pathlib import Path
+from types import MappingProxyType
 from typing import Dict, List, Any
 
+import ijson
+
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
 
 class SQLiteGenerator:
+    # PRAGMAs para la carga: el archivo se crea de cero y nadie más lo usa
+    # mientras se genera. page_size tiene que ir antes de crear tablas.
+    # journal_mode=MEMORY (no OFF) para que el ROLLBACK ante un error siga siendo válido.
+    BUILD_PRAGMAS = (
+        'page_size=8192',
+        'journal_mode=MEMORY',
+        'synchronous=NORMAL',
+        'temp_store=MEMORY',
+        'cache_size=-262144',
+        'locking_mode=EXCLUSIVE',
+        # Lecturas de print_summary desde el archivo mapeado, sin read() por página
+        'mmap_size=268435456',
+    )
+    
+    # Desde este tamaño el JSON se lee en streaming (ijson) en vez de entero
+    STREAM_MIN_BYTES = 64 * 1024 * 1024
+    
+    # Filas por executemany: acota la memoria sin perder el batching
+    INSERT_BATCH = 10_000
+    
+    # Mapeo específico para el formato SNAP (construido una sola vez)
+    TYPE_MAPPING = MappingProxyType({
+        'VARCHAR': 'TEXT',
+        'INTEGER': 'INTEGER',
+        'BOOLEAN': 'INTEGER',  # SQLite usa INTEGER para booleanos
+        'TEXT': 'TEXT',
+        'REAL': 'REAL',
+        'BLOB': 'BLOB',
+        'DATETIME': 'TEXT',
+        'DATE': 'TEXT',
+        'TIMESTAMP': 'TEXT',
+    })
+    
+    # Defaults ORM serializados como texto (compilados una vez)
+    SCALAR_DEFAULT_RE = re.compile(r"ScalarElementColumnDefault\('([^']+)'\)")
+    ORM_DEFAULT_RE = re.compile(r"ColumnDefault|DefaultClause|Scalar")
+    
     def __init__(self, json_file: str, db_file: str):
         self.json_file = Path(json_file)
         self.db_file = Path(db_file)
-        self.data = None
+        self.metadata = None
+        self.conn: sqlite3.Connection | None = None
+        # Registros insertados por tabla (los reutiliza print_summary)
+        self.row_counts: Dict[str, int] = {}
         
         # Verificar que el archivo JSON existe
         if not self.json_file.exists():
@@ -29,122 +79,103 @@ class SQLiteGenerator:
             print(f"✓ Directorio creado: {db_dir}")
     
     def load_json(self) -> Dict[str, Any]:
-        """Carga y valida el archivo JSON formato SNAP."""
+        """
+        Lee solo la sección 'metadata' del JSON formato SNAP.
+        Las tablas se leen después en streaming con iter_tables().
+        """
         try:
-            with open(self.json_file, 'r', encoding='utf-8') as f:
-                self.data = json.load(f)
-            
-            # Validar estructura básica para el formato SNAP
-            required_keys = ['metadata', 'tables']
-            missing_keys = []
-            
-            for key in required_keys:
-                if key not in self.data:
-                    missing_keys.append(key)
+            with open(self.json_file, 'rb') as f:
+                metadata = next(ijson.items(f, 'metadata', use_float=True), None)
             
-            if missing_keys:
-                raise ValueError(f"Claves requeridas no encontradas: {', '.join(missing_keys)}")
+            if metadata is None:
+                raise ValueError("Claves requeridas no encontradas: metadata")
             
-            # Validar que tables no esté vacío
-            if not self.data['tables']:
-                raise ValueError("La sección 'tables' está vacía")
-            
-            # Mostrar información del JSON cargado
-            tables_count = len(self.data['tables'])
-            metadata = self.data['metadata']
+            self.metadata = metadata
             
-            print(f"✓ JSON cargado exitosamente: {self.json_file}")
+            print(f"✓ JSON abierto: {self.json_file}")
             print(f"  - Sistema: {metadata.get('backup_system', 'N/A')}")
             print(f"  - Base de datos origen: {metadata.get('database_file', 'N/A')}")
-            print(f"  - Total de tablas: {tables_count}")
             print(f"  - Total de filas: {metadata.get('total_rows', 'N/A')}")
             print(f"  - Exportado: {metadata.get('exported_at', 'N/A')}")
             
-            return self.data
-            
+            return self.metadata
+        
         except FileNotFoundError:
             raise FileNotFoundError(f"Archivo JSON no encontrado: {self.json_file}")
-        except json.JSONDecodeError as e:
-            raise ValueError(f"Error al parsear JSON en línea {e.lineno}: {e.msg}")
+        except ijson.JSONError as e:
+            raise ValueError(f"Error al parsear JSON: {e}")
+        except ValueError:
+            raise
         except Exception as e:
             raise ValueError(f"Error inesperado al cargar JSON: {e}")
     
-    def validate_json_structure(self):
-        """Valida la estructura del JSON antes de procesar."""
-        print("\n🔍 Validando estructura del JSON...")
-        
+    def iter_tables(self):
+        """
+        Recorre la sección 'tables' tabla por tabla.
+        Hasta STREAM_MIN_BYTES parsea el archivo entero de una vez (orjson si
+        está instalado, ~2.5x más rápido); por encima usa ijson en streaming:
+        cada tabla se parsea, se procesa y se libera antes de leer la
+        siguiente, así en memoria vive una sola tabla a la vez.
+        use_float=True para que los decimales lleguen como float (no Decimal).
+        """
+        try:
+            if self.json_file.stat().st_size < self.STREAM_MIN_BYTES:
+                tables = json_loads(self.json_file.read_bytes()).get('tables')
+                if isinstance(tables, dict):
+                    yield from tables.items()
+                return
+            
+            with open(self.json_file, 'rb') as f:
+                yield from ijson.kvitems(f, 'tables', use_float=True)
+        except (ijson.JSONError, ValueError) as e:
+            raise ValueError(f"Error al parsear JSON: {e}")
+    
+    def validate_table(self, table_name: str, table_info: Dict[str, Any]):
+        """Valida la estructura de una tabla antes de procesarla."""
         issues = []
         warnings = []
         
-        # Verificar cada tabla
-        for table_name, table_info in self.data['tables'].items():
-            # Verificar que tenga la estructura requerida
-            if 'structure' not in table_info:
-                issues.append(f"Tabla '{table_name}': falta la sección 'structure'")
-                continue
-            
-            structure = table_info['structure']
-            if not structure or len(structure) == 0:
-                issues.append(f"Tabla '{table_name}': no tiene columnas definidas")
-                continue
-            
+        # Verificar que tenga la estructura requerida
+        structure = table_info.get('structure')
+        if structure is None:
+            issues.append(f"Tabla '{table_name}': falta la sección 'structure'")
+        elif not structure:
+            issues.append(f"Tabla '{table_name}': no tiene columnas definidas")
+        else:
             # Verificar que cada columna tenga los campos requeridos
             for i, col in enumerate(structure):
                 if 'column_name' not in col:
                     issues.append(f"Tabla '{table_name}', columna {i}: falta 'column_name'")
                 if 'data_type' not in col:
                     issues.append(f"Tabla '{table_name}', columna {i}: falta 'data_type'")
-            
-            # Verificar datos
-            if 'data' not in table_info:
-                warnings.append(f"Tabla '{table_name}': falta la sección 'data'")
-            elif not table_info['data']:
-                warnings.append(f"Tabla '{table_name}': datos vacíos")
-            
-            # Verificar consistencia row_count
-            if 'row_count' in table_info and 'data' in table_info:
-                expected_count = table_info['row_count']
-                actual_count = len(table_info['data']) if table_info['data'] else 0
-                if expected_count != actual_count:
-                    warnings.append(f"Tabla '{table_name}': row_count ({expected_count}) no coincide con datos reales ({actual_count})")
-        
-        # Mostrar resultados de validación
+        
         if issues:
             print("❌ Problemas encontrados:")
             for issue in issues:
                 print(f"   - {issue}")
             raise ValueError("El JSON tiene problemas estructurales que impiden continuar")
         
-        if warnings:
-            print("⚠️  Advertencias:")
-            for warning in warnings:
-                print(f"   - {warning}")
-        
-        tables_count = len(self.data['tables'])
-        total_records = sum(len(table.get('data', [])) for table in self.data['tables'].values())
-        print(f"✓ Estructura válida: {tables_count} tablas, {total_records} registros totales")
+        # Verificar datos
+        if 'data' not in table_info:
+            warnings.append(f"Tabla '{table_name}': falta la sección 'data'")
+        elif not table_info['data']:
+            warnings.append(f"Tabla '{table_name}': datos vacíos")
+        
+        # Verificar consistencia row_count
+        if 'row_count' in table_info and 'data' in table_info:
+            expected_count = table_info['row_count']
+            actual_count = len(table_info['data']) if table_info['data'] else 0
+            if expected_count != actual_count:
+                warnings.append(f"Tabla '{table_name}': row_count ({expected_count}) no coincide con datos reales ({actual_count})")
+        
+        for warning in warnings:
+            print(f"   ⚠️  {warning}")
     
     def map_snap_column_type(self, snap_type: str) -> str:
         """Mapea tipos específicos del formato SNAP a SQLite."""
         if not snap_type:
             return 'TEXT'
-            
-        snap_type = snap_type.upper()
-        
-        # Mapeo específico para el formato SNAP
-        type_mapping = {
-            'VARCHAR': 'TEXT',
-            'INTEGER': 'INTEGER', 
-            'BOOLEAN': 'INTEGER',  # SQLite usa INTEGER para booleanos
-            'TEXT': 'TEXT',
-            'REAL': 'REAL',
-            'BLOB': 'BLOB',
-            'DATETIME': 'TEXT',
-            'DATE': 'TEXT',
-            'TIMESTAMP': 'TEXT'
-        }
-        
-        return type_mapping.get(snap_type, 'TEXT')
+        return self.TYPE_MAPPING.get(snap_type.upper(), 'TEXT')
     
     def create_table_sql(self, table_name: str, structure: List[Dict[str, Any]]) -> str:
         """Genera el SQL CREATE TABLE para una tabla con formato SNAP."""
@@ -190,37 +221,39 @@ class SQLiteGenerator:
         if default_val is None:
             return "NULL"
         
+        # Valores booleanos y numéricos: salen antes de convertir a string
+        if default_val is True:
+            return "1"
+        if default_val is False:
+            return "0"
+        if isinstance(default_val, (int, float)):
+            return str(default_val)
+        
         # Convertir a string para analizar
         default_str = str(default_val)
         
         # Detectar objetos SQLAlchemy serializados incorrectamente
-        if "ScalarElementColumnDefault" in default_str:
-            # Extraer el valor entre comillas simples
-            import re
-            match = re.search(r"ScalarElementColumnDefault\('([^']+)'\)", default_str)
-            if match:
-                extracted_value = match.group(1)
-                return f"'{extracted_value}'"
-            else:
-                # Si no se puede extraer, usar NULL
+        # (un par de 'in' descarta los strings normales sin pasar por el regex)
+        if "Default" in default_str or "Scalar" in default_str:
+            if "ScalarElementColumnDefault" in default_str:
+                # Extraer el valor entre comillas simples
+                match = self.SCALAR_DEFAULT_RE.search(default_str)
+                if match:
+                    extracted_value = match.group(1)
+                    return f"'{extracted_value}'"
+                else:
+                    # Si no se puede extraer, usar NULL
+                    return "NULL"
+            
+            # Manejar otros objetos ORM serializados incorrectamente
+            if self.ORM_DEFAULT_RE.search(default_str):
+                # Para otros tipos de objetos ORM, usar NULL como fallback seguro
                 return "NULL"
         
-        # Manejar otros objetos ORM serializados incorrectamente
-        if any(obj_type in default_str for obj_type in ['ColumnDefault', 'DefaultClause', 'Scalar']):
-            # Para otros tipos de objetos ORM, usar NULL como fallback seguro
-            return "NULL"
-        
         # Valores especiales de SQL
-        if default_str.upper() in ['NULL', 'CURRENT_TIMESTAMP', 'CURRENT_DATE', 'CURRENT_TIME']:
-            return default_str.upper()
-        
-        # Valores booleanos
-        if isinstance(default_val, bool):
-            return "1" if default_val else "0"
-        
-        # Valores numéricos
-        if isinstance(default_val, (int, float)):
-            return str(default_val)
+        default_upper = default_str.upper()
+        if default_upper in ('NULL', 'CURRENT_TIMESTAMP', 'CURRENT_DATE', 'CURRENT_TIME'):
+            return default_upper
         
         # Strings normales - escapar comillas simples
         if isinstance(default_val, str):
@@ -231,174 +264,231 @@ class SQLiteGenerator:
         # Fallback para otros tipos
         return "NULL"
     
+    def open_connection(self, db_path: Path) -> sqlite3.Connection:
+        """
+        Abre una conexión a db_path con BUILD_PRAGMAS aplicados.
+        isolation_level=None: la transacción se maneja explícitamente, así
+        los CREATE TABLE y los INSERT van todos en un único BEGIN ... COMMIT.
+        """
+        conn = sqlite3.connect(db_path, isolation_level=None)
+        for pragma in self.BUILD_PRAGMAS:
+            conn.execute(f"PRAGMA {pragma}")
+        return conn
+    
+    def connect(self) -> sqlite3.Connection:
+        """
+        Conexión a db_file para leer la DB ya generada (print_summary); se
+        abre una vez y la cierra close(). La carga usa su propia conexión al
+        archivo temporal (ver create_database).
+        """
+        if self.conn is None:
+            self.conn = self.open_connection(self.db_file)
+        return self.conn
+    
+    def close(self):
+        """Cierra la conexión abierta por connect(), si la hay."""
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+    
     def create_database(self):
-        """Crea la base de datos SQLite con todas las tablas."""
-        # Eliminar DB existente si existe
-        if self.db_file.exists():
-            self.db_file.unlink()
-            print(f"✓ Base de datos existente eliminada: {self.db_file}")
-        
-        conn = sqlite3.connect(self.db_file)
+        """
+        Crea la base de datos en una sola pasada sobre el JSON: por cada
+        tabla valida, crea la tabla e inserta sus datos antes de leer la
+        siguiente.
+        Se construye en un archivo temporal al lado de db_file y solo tras el
+        COMMIT reemplaza a la DB existente: si el JSON está truncado o una
+        tabla no valida, la DB anterior queda intacta.
+        """
+        self.close()
+        tmp_file = self.db_file.with_name(f"{self.db_file.name}.tmp")
+        if tmp_file.exists():
+            tmp_file.unlink()
+        
+        # Conexión propia al temporal: se cierra antes del swap
+        conn = self.open_connection(tmp_file)
         cursor = conn.cursor()
         
         try:
-            tables = self.data['tables']
+            print(f"\n🔧 Creando tablas e insertando datos...")
             
-            print(f"\n🔧 Creando tablas...")
+            tables_count = 0
+            total_records = 0
+            self.row_counts = {}
+            cursor.execute("BEGIN IMMEDIATE")
             
-            # Crear cada tabla
-            for table_name, table_info in tables.items():
-                if 'structure' in table_info:
-                    structure = table_info['structure']
-                    
-                    try:
-                        create_sql = self.create_table_sql(table_name, structure)
-                        
-                        print(f"   Creando tabla: {table_name}")
-                        cursor.execute(create_sql)
-                        
-                        row_count = table_info.get('row_count', 0)
-                        actual_data_count = len(table_info.get('data', []))
-                        print(f"   └─ {len(structure)} columnas, {actual_data_count} registros")
-                        
-                    except Exception as table_error:
-                        print(f"\n❌ Error en tabla '{table_name}':")
-                        print(f"   Mensaje: {table_error}")
-                        print(f"   SQL generado:")
-                        try:
-                            failed_sql = self.create_table_sql(table_name, structure)
-                            print(f"   {failed_sql}")
-                        except:
-                            print(f"   No se pudo generar el SQL")
-                        
-                        # Mostrar estructura de la tabla problemática
-                        print(f"   Estructura de la tabla:")
-                        for i, col in enumerate(structure):
-                            print(f"   [{i}] {col}")
-                        
-                        raise table_error
+            for table_name, table_info in self.iter_tables():
+                self.validate_table(table_name, table_info)
+                self.create_table(cursor, table_name, table_info)
+                inserted = self.insert_data(cursor, table_name, table_info.get('data', []))
+                self.row_counts[table_name] = inserted
+                total_records += inserted
+                tables_count += 1
             
-            conn.commit()
-            print("✓ Todas las tablas creadas exitosamente")
+            # Validar que tables no esté vacío
+            if not tables_count:
+                raise ValueError("La sección 'tables' está vacía o no existe")
             
-        except Exception as e:
-            conn.rollback()
-            raise Exception(f"Error creando tablas: {e}")
+            cursor.execute("COMMIT")
+            print(f"✓ {tables_count} tablas creadas, {total_records} registros insertados")
         
-        finally:
+        except Exception as e:
+            if conn.in_transaction:
+                cursor.execute("ROLLBACK")
             conn.close()
+            tmp_file.unlink(missing_ok=True)
+            raise Exception(f"Error creando base de datos: {e}")
+        
+        # Swap atómico: os.replace pisa el destino en un solo paso. Se cierra
+        # antes porque en Windows no se puede renombrar un archivo abierto.
+        conn.close()
+        existed = self.db_file.exists()
+        os.replace(tmp_file, self.db_file)
+        if existed:
+            print(f"✓ Base de datos existente reemplazada: {self.db_file}")
     
-    def insert_data(self):
-        """Inserta los datos en las tablas."""
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
+    def create_table(self, cursor: sqlite3.Cursor, table_name: str, table_info: Dict[str, Any]):
+        """Crea una tabla a partir de su estructura SNAP."""
+        structure = table_info['structure']
+        create_sql = None
         
         try:
-            tables = self.data['tables']
+            create_sql = self.create_table_sql(table_name, structure)
             
-            print(f"\n📊 Insertando datos...")
+            print(f"   Creando tabla: {table_name}")
+            cursor.execute(create_sql)
             
-            for table_name, table_info in tables.items():
-                table_data = table_info.get('data', [])
-                
-                if not table_data:  # Tabla vacía
-                    print(f"   Tabla {table_name}: sin datos")
-                    continue
-                
-                # Procesar datos (formato SNAP: lista de objetos)
-                if isinstance(table_data, list) and len(table_data) > 0:
-                    first_record = table_data[0]
-                    
-                    if isinstance(first_record, dict):
-                        columns = list(first_record.keys())
-                        
-                        # Preparar SQL de inserción
-                        placeholders = ', '.join(['?' for _ in columns])
-                        columns_sql = ', '.join([f'`{col}`' for col in columns])
-                        insert_sql = f"INSERT INTO `{table_name}` ({columns_sql}) VALUES ({placeholders})"
-                        
-                        # Preparar datos para inserción
-                        rows_to_insert = []
-                        for record in table_data:
-                            if isinstance(record, dict):
-                                row = []
-                                for col in columns:
-                                    value = record.get(col)
-                                    # Convertir valores especiales de SNAP
-                                    if value is None or value == 'NULL' or value == '':
-                                        value = None
-                                    elif isinstance(value, str) and value.lower() == 'null':
-                                        value = None
-                                    # Convertir booleanos para SQLite
-                                    elif isinstance(value, bool):
-                                        value = 1 if value else 0
-                                    row.append(value)
-                                rows_to_insert.append(row)
-                        
-                        # Insertar en lotes para mejor rendimiento
-                        if rows_to_insert:
-                            cursor.executemany(insert_sql, rows_to_insert)
-                            print(f"   Tabla {table_name}: {len(rows_to_insert)} registros insertados")
-                        else:
-                            print(f"   Tabla {table_name}: sin datos válidos para insertar")
-                    
-                    else:
-                        print(f"   Tabla {table_name}: formato de datos no reconocido")
-                
-                else:
-                    print(f"   Tabla {table_name}: formato de datos no estándar")
+            actual_data_count = len(table_info.get('data') or [])
+            print(f"   └─ {len(structure)} columnas, {actual_data_count} registros")
+        
+        except Exception as table_error:
+            print(f"\n❌ Error en tabla '{table_name}':")
+            print(f"   Mensaje: {table_error}")
+            print(f"   SQL generado:")
+            # El SQL ya generado arriba; None si falló justamente al generarlo
+            if create_sql is not None:
+                print(f"   {create_sql}")
+            else:
+                print(f"   No se pudo generar el SQL")
             
-            conn.commit()
-            print("✓ Todos los datos insertados exitosamente")
+            # Mostrar estructura de la tabla problemática
+            print(f"   Estructura de la tabla:")
+            for i, col in enumerate(structure):
+                print(f"   [{i}] {col}")
             
-        except Exception as e:
-            conn.rollback()
-            raise Exception(f"Error insertando datos: {e}")
-        
-        finally:
-            conn.close()
+            raise table_error
+    
+    def insert_data(self, cursor: sqlite3.Cursor, table_name: str, table_data: Any) -> int:
+        """Inserta los datos de una tabla. Retorna la cantidad de registros insertados."""
+        if not table_data:  # Tabla vacía
+            print(f"   Tabla {table_name}: sin datos")
+            return 0
+        
+        # Procesar datos (formato SNAP: lista de objetos)
+        if not isinstance(table_data, list):
+            print(f"   Tabla {table_name}: formato de datos no estándar")
+            return 0
+        
+        first_record = table_data[0]
+        if not isinstance(first_record, dict):
+            print(f"   Tabla {table_name}: formato de datos no reconocido")
+            return 0
+        
+        columns = [sys.intern(col) for col in first_record.keys()]
+        if not columns:
+            print(f"   Tabla {table_name}: registros sin columnas")
+            return 0
+        
+        # Preparar SQL de inserción. Los valores especiales de SNAP ('' y 'null'
+        # en cualquier mayúscula -> NULL) los normaliza SQLite al insertar, así
+        # el loop de Python solo arma tuplas. COLLATE NOCASE compara sin
+        # convertir los números a texto (lower() sí lo haría). Los booleanos no
+        # necesitan conversión: sqlite3 los guarda como 1/0 (bool es int).
+        placeholders = ', '.join(["NULLIF(NULLIF(? COLLATE NOCASE, ''), 'null')"] * len(columns))
+        columns_sql = ', '.join([f'`{col}`' for col in columns])
+        insert_sql = f"INSERT INTO `{table_name}` ({columns_sql}) VALUES ({placeholders})"
+        
+        # Extraer todas las columnas de un registro en una sola llamada en C
+        getter = itemgetter(*columns)
+        if len(columns) == 1:
+            single = getter
+            getter = lambda record: (single(record),)
+        
+        # Insertar en lotes acotados de INSERT_BATCH registros: nunca están
+        # todas las filas de la tabla convertidas en memoria a la vez
+        records = iter(self.dict_records(table_data))
+        inserted = 0
+        while batch := list(itertools.islice(records, self.INSERT_BATCH)):
+            try:
+                values = list(map(getter, batch))
+            except KeyError:
+                # Registros sin alguna columna: get() deja None como antes
+                values = [[record.get(col) for col in columns] for record in batch]
+            cursor.executemany(insert_sql, values)
+            inserted += len(batch)
+        
+        if not inserted:
+            print(f"   Tabla {table_name}: sin datos válidos para insertar")
+            return 0
+        
+        print(f"   Tabla {table_name}: {inserted} registros insertados")
+        return inserted
+    
+    def dict_records(self, table_data: List[Any]) -> List[Dict[str, Any]]:
+        """
+        Registros dict de la tabla. Lo normal es que sean todos dicts: se
+        comprueba una vez con all() (map en C) y el loop de inserción ya no
+        chequea fila por fila. Solo si hay mezcla se filtran.
+        """
+        if all(map(dict.__instancecheck__, table_data)):
+            return table_data
+        return [record for record in table_data if isinstance(record, dict)]
     
     def print_summary(self):
         """Imprime un resumen de la base de datos creada."""
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
+        cursor = self.connect().cursor()
         
         try:
             print(f"\n📋 Resumen de la base de datos: {self.db_file}")
             print("-" * 50)
             
-            # Obtener lista de tablas
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-            tables = cursor.fetchall()
+            # Tablas y sus columnas en una sola consulta (pragma_table_info como tabla)
+            cursor.execute(
+                "SELECT m.name, p.name FROM sqlite_master AS m "
+                "JOIN pragma_table_info(m.name) AS p "
+                "WHERE m.type = 'table' ORDER BY m.rowid, p.cid"
+            )
+            tables = [
+                (table_name, [col for _, col in rows])
+                for table_name, rows in itertools.groupby(cursor.fetchall(), key=itemgetter(0))
+            ]
             
             total_records = 0
             
-            for (table_name,) in tables:
-                # Contar registros
-                cursor.execute(f"SELECT COUNT(*) FROM `{table_name}`")
-                count = cursor.fetchone()[0]
+            for table_name, columns in tables:
+                # Registros: los cuenta insert_data; COUNT(*) solo si la tabla no pasó por acá
+                count = self.row_counts.get(table_name)
+                if count is None:
+                    cursor.execute(f"SELECT COUNT(*) FROM `{table_name}`")
+                    count = cursor.fetchone()[0]
                 total_records += count
                 
-                # Obtener info de columnas
-                cursor.execute(f"PRAGMA table_info(`{table_name}`)")
-                columns_info = cursor.fetchall()
-                
                 print(f"Tabla: {table_name}")
                 print(f"  └─ Registros: {count}")
-                print(f"  └─ Columnas: {len(columns_info)}")
+                print(f"  └─ Columnas: {len(columns)}")
                 
                 # Mostrar primeras columnas
-                col_names = [col[1] for col in columns_info[:3]]
-                if len(columns_info) > 3:
-                    col_names.append(f"... (+{len(columns_info)-3} más)")
+                col_names = columns[:3]
+                if len(columns) > 3:
+                    col_names.append(f"... (+{len(columns)-3} más)")
                 print(f"     [{', '.join(col_names)}]")
                 print()
             
             print(f"TOTAL: {len(tables)} tablas, {total_records} registros")
             
             # Información adicional del metadata si existe
-            if 'metadata' in self.data:
-                metadata = self.data['metadata']
+            if self.metadata:
+                metadata = self.metadata
                 print("\nInformación del backup:")
                 print(f"  Sistema: {metadata.get('backup_system', 'N/A')}")
                 print(f"  Archivo origen: {metadata.get('database_file', 'N/A')}")
@@ -406,7 +496,7 @@ class SQLiteGenerator:
                 print(f"  Motor ORM: {metadata.get('orm_engine', 'N/A')}")
         
         finally:
-            conn.close()
+            cursor.close()
     
     def generate(self):
         """Ejecuta todo el proceso de generación."""
@@ -414,20 +504,17 @@ class SQLiteGenerator:
         print(f"Archivo JSON: {self.json_file}")
         print(f"Base de datos: {self.db_file}")
         
-        # Cargar y validar JSON
+        # Leer metadata del JSON
         self.load_json()
         
-        # Validar estructura del JSON
-        self.validate_json_structure()
-        
-        # Crear estructura de tablas
-        self.create_database()
-        
-        # Insertar datos
-        self.insert_data()
-        
-        # Mostrar resumen
-        self.print_summary()
+        try:
+            # Crear tablas e insertar datos (una pasada en streaming)
+            self.create_database()
+            
+            # Mostrar resumen (reabre sobre el archivo final, ya reemplazado)
+            self.print_summary()
+        finally:
+            self.close()
         
         print(f"\n🎉 Base de datos creada exitosamente: {self.db_file}")
         print(f"📊 Tamaño del archivo: {self.db_file.stat().st_size / 1024:.1f} KB")
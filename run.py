@@ -35,6 +35,9 @@ async def run_api():
         host=settings.api_host,
         port=settings.api_port,
         log_level="warning",
+        # Mayor que el keepalive_timeout (60s) de la sesion del bot: uvicorn cierra
+        # conexiones ociosas a los 5s por defecto y el bot reabriria una por comando
+        timeout_keep_alive=75,
     )
     server = uvicorn.Server(config)
     await server.serve()
@@ -114,7 +117,16 @@ async def main():
 
 
 if __name__ == "__main__":
+    # uvloop (libuv) acelera el I/O de discord.py, aiohttp y uvicorn.
+    # Viene con uvicorn[standard]; en Windows no existe y se usa asyncio.
     try:
-        asyncio.run(main())
+        import uvloop
+
+        _run = uvloop.run
+    except ImportError:
+        _run = asyncio.run
+
+    try:
+        _run(main())
     except KeyboardInterrupt:
         pass